@@ -3,13 +3,30 @@
 Provides access to regulatory and compliance data
 """
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, FrozenSet, List, Optional
 import asyncio
+import re
 from datetime import datetime, timedelta
 import json
 
 logger = logging.getLogger(__name__)
 
+# Lowercase word tokens attached to each record as "_tokens" for keyword matching
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def keyword_tokens(text: str) -> FrozenSet[str]:
+    """Lowercase word tokens of the text plus their singular forms, so plurals match singular keywords"""
+    tokens = set(_TOKEN_RE.findall(text.lower()))
+    for token in list(tokens):
+        if len(token) <= 3 or not token.endswith("s") or token.endswith("ss"):
+            continue
+        if token.endswith("ies"):
+            tokens.add(token[:-3] + "y")  # liabilities -> liability
+        elif token.endswith("es"):
+            tokens.add(token[:-2])  # taxes -> tax
+        tokens.add(token[:-1])  # workers -> worker, licenses -> license
+    return frozenset(tokens)
+
 class ComplianceDB:
     def __init__(self):
         self.regulations_db = {}
@@ -17,6 +34,7 @@ class ComplianceDB:
         self.cache_ttl = 3600  # 1 hour
         self.legal_knowledge_base = None
         self.dataset_loader = None
+        self.record_tokens = {}
         
     async def initialize(self, dataset_loader=None):
         """Initialize Compliance Database"""
@@ -120,6 +138,12 @@ class ComplianceDB:
         
         # Also store as regulatory_frameworks for compatibility
         self.regulatory_frameworks = self.regulations_db
+        
+        # Tokenize each record's name and description once at load instead of on every search
+        self.record_tokens = {
+            reg_name: keyword_tokens(f"{reg_name} {reg_info.get('description', '')}")
+            for reg_name, reg_info in self.regulations_db.items()
+        }
     
     async def assess_compliance(self, scenario: str, business_type: str = "general") -> Dict[str, Any]:
         """Generic compliance assessment method"""
@@ -150,7 +174,8 @@ class ComplianceDB:
                         "description": reg_info.get("description", ""),
                         "severity_level": reg_info.get("penalties", {}).get("severity", "medium"),
                         "framework": reg_info.get("framework", "general"),
-                        "requirements": reg_info.get("requirements", [])
+                        "requirements": reg_info.get("requirements", []),
+                        "_tokens": self.record_tokens.get(reg_name, frozenset())
                     })
             
             return records[:limit]
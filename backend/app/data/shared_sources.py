@@ -0,0 +1,27 @@
+"""
+🔗 Shared Data Sources
+One initialized instance of each data source per process, shared by every agent
+(embedding models and datasets are loaded once instead of once per agent)
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+_instances: Dict[type, Any] = {}
+# Per-class locks so concurrent callers (e.g. asyncio.gather) never initialize a source twice
+_locks: Dict[type, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+async def get_shared(source_cls):
+    """Return the process-wide initialized instance of a data source class"""
+    async with _locks[source_cls]:
+        instance = _instances.get(source_cls)
+        if instance is None:
+            instance = source_cls()
+            await instance.initialize()
+            _instances[source_cls] = instance
+        else:
+            logger.info(f"♻️ Reusing initialized {source_cls.__name__}")
+    return instance
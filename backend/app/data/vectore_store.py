@@ -12,8 +12,16 @@ from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import pickle
 
+try:
+    from annoy import AnnoyIndex
+except ImportError:  # Annoy is optional - legal search falls back to brute-force cosine similarity
+    AnnoyIndex = None
+
 logger = logging.getLogger(__name__)
 
+# Trees in the Annoy forest (more trees = better recall, larger index)
+ANN_TREES = 50
+
 class VectorStore:
     def __init__(self):
         self.embeddings = {}
@@ -22,6 +30,7 @@ class VectorStore:
         self.legal_embeddings = None
         self.financial_embeddings = None
         self.market_embeddings = None
+        self.legal_ann = None
         self.dataset_loader = None
         
     async def initialize(self, dataset_loader=None):
@@ -101,6 +110,7 @@ class VectorStore:
                 }
                 
                 logger.info(f"📖 Generated embeddings for {len(texts)} legal Q&A pairs")
+                self.legal_ann = self._build_ann_index(embeddings)
             
         except Exception as e:
             logger.error(f"Error generating legal embeddings: {e}")
@@ -185,6 +195,41 @@ class VectorStore:
         except Exception as e:
             logger.error(f"Error generating market embeddings: {e}")
     
+    def _build_ann_index(self, embeddings):
+        """Build an Annoy index (angular distance) over an embedding matrix"""
+        if AnnoyIndex is None or embeddings is None or len(embeddings) == 0:
+            return None
+        
+        try:
+            index = AnnoyIndex(embeddings.shape[1], 'angular')
+            for i, vector in enumerate(embeddings):
+                index.add_item(i, vector)
+            index.build(ANN_TREES)
+            logger.info(f"🌲 Built ANN index over {len(embeddings)} vectors ({ANN_TREES} trees)")
+            return index
+        except Exception as e:
+            logger.warning(f"ANN index unavailable, using brute-force search: {e}")
+            return None
+    
+    def _legal_neighbors(self, query_embedding, top_k: int) -> List[Tuple[int, float]]:
+        """Top-k legal embeddings as (index, cosine similarity) - ANN when indexed, brute-force otherwise"""
+        indexed = self.legal_ann.get_n_items() if self.legal_ann else 0
+        neighbors = []
+        
+        if indexed:
+            ids, distances = self.legal_ann.get_nns_by_vector(query_embedding[0], top_k, include_distances=True)
+            # Annoy angular distance is sqrt(2 - 2cos)
+            neighbors = [(idx, 1.0 - (dist ** 2) / 2.0) for idx, dist in zip(ids, distances)]
+        
+        # Brute-force the tail of vectors added since the index was built
+        tail = self.legal_embeddings["embeddings"][indexed:]
+        if len(tail):
+            similarities = cosine_similarity(query_embedding, tail)[0]
+            neighbors.extend((indexed + i, float(sim)) for i, sim in enumerate(similarities))
+        
+        neighbors.sort(key=lambda item: item[1], reverse=True)
+        return neighbors[:top_k]
+    
     async def search_legal_knowledge(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Search legal knowledge base using semantic similarity"""
         if not self.legal_embeddings or not self.model:
@@ -197,19 +242,10 @@ class VectorStore:
             # Generate query embedding
             query_embedding = self.model.encode([query])
             
-            # Calculate similarities
-            similarities = cosine_similarity(
-                query_embedding, 
-                self.legal_embeddings["embeddings"]
-            )[0]
-            
             # Get top-k most similar
-            top_indices = np.argsort(similarities)[::-1][:top_k]
-            
             results = []
-            for idx in top_indices:
+            for idx, similarity_score in self._legal_neighbors(query_embedding, top_k):
                 metadata = self.legal_embeddings["metadata"][idx]
-                similarity_score = float(similarities[idx])
                 
                 result = {
                     "question": metadata["question"],
@@ -347,6 +383,9 @@ class VectorStore:
             with open(filepath, 'wb') as f:
                 pickle.dump(data, f)
             
+            if self.legal_ann:
+                self.legal_ann.save(f"{os.path.splitext(filepath)[0]}.ann")
+            
             logger.info(f"Embeddings saved to {filepath}")
             
         except Exception as e:
@@ -364,6 +403,16 @@ class VectorStore:
                 self.market_embeddings = data.get("market_embeddings")
                 self.index = data.get("custom_index", {})
                 
+                # Reload the persisted ANN index, rebuilding it if missing
+                ann_path = f"{os.path.splitext(filepath)[0]}.ann"
+                self.legal_ann = None
+                if AnnoyIndex is not None and self.legal_embeddings and os.path.exists(ann_path):
+                    embeddings = self.legal_embeddings["embeddings"]
+                    self.legal_ann = AnnoyIndex(embeddings.shape[1], 'angular')
+                    self.legal_ann.load(ann_path)
+                elif self.legal_embeddings:
+                    self.legal_ann = self._build_ann_index(self.legal_embeddings["embeddings"])
+                
                 logger.info(f"Embeddings loaded from {filepath}")
                 return True
             
@@ -2,18 +2,249 @@
 ⚖️ Compliance Agent - Legal and Regulatory Analysis
 RTX 4050 GPU Optimized with Legal-BERT
 """
+import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoModel
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
 import asyncio
+import contextlib
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from hashlib import blake2b
+
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+except ImportError:  # ONNX Runtime is optional - CPU falls back to int8 PyTorch
+    ORTModelForFeatureExtraction = None
 
 # Data pipeline imports
-from app.data.compliance_db import ComplianceDB
+from app.data.compliance_db import ComplianceDB, keyword_tokens
 from app.data.vectore_store import VectorStore
+from app.data.shared_sources import get_shared
 
 logger = logging.getLogger(__name__)
 
+# Compliance areas analyzed per scenario: canonical id (the compliance_scores key) -> display label
+_COMPLIANCE_AREAS: Dict[str, str] = {
+    "data_protection_and_privacy": "Data Protection and Privacy (GDPR, CCPA)",
+    "financial_services_regulations": "Financial Services Regulations (SOX, Basel III)",
+    "industry-specific_compliance": "Industry-Specific Compliance (FDA, FCC, EPA)",
+    "international_trade_and_export_controls": "International Trade and Export Controls",
+    "labor_and_employment_laws": "Labor and Employment Laws",
+    "intellectual_property_protection": "Intellectual Property Protection",
+    "anti-money_laundering": "Anti-Money Laundering (AML)",
+    "cybersecurity_and_data_security_standards": "Cybersecurity and Data Security Standards"
+}
+
+# Keywords per compliance area, keyed by canonical area id
+_AREA_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    "data_protection_and_privacy": frozenset({"data", "privacy", "personal", "personalized", "gdpr", "ccpa", "consent"}),
+    "financial_services_regulations": frozenset({"financial", "banking", "securities", "sox", "basel", "audit"}),
+    "industry-specific_compliance": frozenset({"industry", "regulation", "standard", "certification", "fda", "fcc"}),
+    "international_trade_and_export_controls": frozenset({"international", "export", "import", "trade", "customs", "tariff"}),
+    "labor_and_employment_laws": frozenset({"employment", "labor", "worker", "workplace", "discrimination", "safety"}),
+    "intellectual_property_protection": frozenset({"patent", "trademark", "copyright", "intellectual", "property", "license"}),
+    "anti-money_laundering": frozenset({"aml", "money", "laundering", "kyc", "suspicious", "transaction"}),
+    "cybersecurity_and_data_security_standards": frozenset({"cybersecurity", "security", "data", "breach", "encryption", "access"})
+}
+
+# Confidence signals, each matched in a single pass over the text
+_COMPLIANCE_TERMS = re.compile(r"regulation|compliance|legal|law|requirement|framework")
+_SPECIFIC_TERMS = re.compile(r"gdpr|hipaa|sox|data protection|privacy|audit|certification")
+_INTERNATIONAL_TERMS = re.compile(r"international|global|cross-border")
+_LOCAL_TERMS = re.compile(r"local|domestic|single market")
+
+# Legal-BERT scenario embeddings kept across analyze calls (LRU, keyed by scenario digest)
+EMBEDDING_CACHE_SIZE = 1024
+
+# Scenarios and area labels are short - attention cost is quadratic in sequence length, so cap well below 512
+LEGAL_BERT_MAX_TOKENS = 128
+
+# Exported ONNX Legal-BERT graphs, so the export runs once per machine instead of once per process
+ONNX_CACHE_DIR = os.path.expanduser(os.getenv("AIRA_ONNX_CACHE_DIR", "~/.aira/onnx"))
+
+@dataclass
+class RecordSummary:
+    """Aggregates gathered in a single pass over the retrieved compliance records"""
+    sev_counts: Dict[str, int] = field(default_factory=lambda: {"high": 0, "medium": 0, "low": 0})
+    per_area_matches: Dict[str, List[Dict]] = field(default_factory=dict)
+    frameworks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    high_priority: List[Dict] = field(default_factory=list)
+    top_requirements: List[str] = field(default_factory=list)
+
+# One Legal-BERT (tokenizer, model) pair per (model name, device) across agent instances
+_MODEL_CACHE: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+_MODEL_LOCK = asyncio.Lock()
+
+def _load_legal_bert(model_name: str, device: str) -> Tuple[Any, Any]:
+    """Load the Legal-BERT tokenizer and inference-ready model for a device"""
+    # Load tokenizer with local cache preference
+    tokenizer = AutoTokenizer.from_pretrained(
+        model_name,
+        use_fast=True,           # Rust tokenizer - batched encoding without per-text Python overhead
+        local_files_only=False,  # Allow fallback to cache
+        force_download=False,    # Use cache if available
+        cache_dir=None          # Use default cache location
+    )
+    if not tokenizer.is_fast:
+        logger.warning(f"⚠️ No fast tokenizer available for {model_name} - using the slow Python tokenizer")
+
+    # ONNX Runtime's fused BERT graph is the fastest CPU path when it is installed
+    if device != "cuda" and ORTModelForFeatureExtraction is not None:
+        model = _load_onnx_legal_bert(model_name, tokenizer)
+        if model is not None:
+            return tokenizer, model
+
+    # Load Legal-BERT model with GPU/CPU optimization
+    if device == "cuda":
+        # GPU configuration - FP16 Legal-BERT (~220MB) fits on the RTX 4050 whole, so place it on one
+        # device directly instead of going through accelerate's dispatcher and per-layer hooks
+        model = AutoModel.from_pretrained(
+            model_name,
+            torch_dtype=torch.float16,
+            attn_implementation="sdpa",  # Fused scaled_dot_product_attention kernels (flash / mem-efficient)
+            use_safetensors=True,
+            trust_remote_code=True,
+            local_files_only=False,
+            force_download=False
+        ).to(device)
+        logger.info(f"✅ Compliance Agent ready on {device.upper()} - Legal-BERT (~0.3GB VRAM)")
+    else:
+        # CPU configuration with memory limits
+        model = AutoModel.from_pretrained(
+            model_name,
+            torch_dtype=torch.float32,  # Use float32 for CPU stability
+            attn_implementation="sdpa",  # Fused attention instead of materializing the full score matrix
+            device_map={"": "cpu"},  # Force CPU device mapping
+            use_safetensors=True,
+            trust_remote_code=True,
+            low_cpu_mem_usage=True,
+            torchscript=True,  # Tuple outputs so the model can be traced
+            local_files_only=False,  # Allow fallback to cache
+            force_download=False     # Use cache if available
+        )
+        # Int8 dynamic quantization of the Linear layers - ~2x smaller and faster on CPU
+        # (fbgemm provides the VNNI int8 GEMM kernels on x86; qnnpack is the ARM fallback)
+        if "fbgemm" in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "fbgemm"
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info(f"✅ Compliance Agent ready on {device.upper()} - Legal-BERT int8 (~0.2GB RAM)")
+
+    # Inference only - no dropout, no gradient bookkeeping
+    model.eval()
+    for param in model.parameters():
+        param.requires_grad_(False)
+    
+    if device == "cuda":
+        model = _compile_legal_bert(model, tokenizer, device)
+    else:
+        model = _trace_legal_bert(model, tokenizer)
+    
+    return tokenizer, model
+
+def _load_onnx_legal_bert(model_name: str, tokenizer):
+    """Run Legal-BERT in an ORT CPU session with all graph fusions enabled, exporting it to ONNX once"""
+    try:
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = os.cpu_count() or 1
+        export_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"))
+        if not os.path.isdir(export_dir):
+            _export_onnx_legal_bert(model_name, export_dir)
+        model = ORTModelForFeatureExtraction.from_pretrained(
+            export_dir,
+            export=False,
+            provider="CPUExecutionProvider",
+            session_options=options
+        )
+        # The first session runs allocate arenas and pick kernels - keep that off the first request
+        warmup = tokenizer(["warmup"] * 8, return_tensors="pt", padding=True)
+        for _ in range(3):
+            model(**warmup)
+        logger.info("✅ Compliance Agent ready on CPU - Legal-BERT ONNX Runtime (fused graph)")
+        return model
+    except Exception as e:
+        logger.warning(f"⚠️ ONNX Runtime unavailable for Legal-BERT ({e}) - using int8 PyTorch")
+        return None
+
+def _export_onnx_legal_bert(model_name: str, export_dir: str):
+    """Export Legal-BERT to ONNX under export_dir (built in a temp dir and renamed, so workers never see half an export)"""
+    logger.info(f"📦 Exporting {model_name} to ONNX under {export_dir}")
+    os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=ONNX_CACHE_DIR, suffix=".tmp")
+    try:
+        ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(tmp_dir)
+        try:
+            os.replace(tmp_dir, export_dir)
+        except OSError:
+            if not os.path.isdir(export_dir):  # Not just a concurrent worker finishing first
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _trace_legal_bert(model, tokenizer):
+    """TorchScript-trace and freeze the int8 CPU encoder so oneDNN can fuse its op chains"""
+    try:
+        torch.jit.enable_onednn_fusion(True)
+        sample = dict(tokenizer(["Analyzing compliance for: warmup"] * 2, return_tensors="pt", padding=True))
+        probe = dict(tokenizer(["a longer probe sentence to check the trace generalizes across shapes"] * 3,
+                               return_tensors="pt", padding=True))
+        with torch.no_grad():
+            traced = torch.jit.freeze(torch.jit.trace(model, example_kwarg_inputs=sample, strict=False))
+            # Profiling runs let the fuser specialize; then make sure other shapes still match eager
+            for _ in range(2):
+                traced(**sample)
+            if not torch.allclose(traced(**probe)[0], model(**probe)[0], atol=1e-3):
+                raise RuntimeError("traced outputs diverge from eager")
+        logger.info("🔥 Legal-BERT traced and frozen for oneDNN fusion")
+        return traced
+    except Exception as e:
+        logger.warning(f"⚠️ TorchScript tracing unavailable for Legal-BERT ({e}) - running eager")
+        return model
+
+def _compile_legal_bert(model, tokenizer, device: str):
+    """torch.compile the encoder for kernel fusion and pay the compile cost with a warmup batch"""
+    try:
+        # Static shapes: every input is padded to LEGAL_BERT_MAX_TOKENS, so only the two batch sizes
+        # warmed below are compiled (Inductor code is process-wide, so any worker thread reuses it)
+        # No CUDA graphs: calls arrive on asyncio.to_thread workers and graph trees are thread-local,
+        # so each thread would record its own graphs and pool and could overwrite another's outputs
+        compiled = torch.compile(model, mode="max-autotune-no-cudagraphs", dynamic=False)
+        for batch_size in (len(_COMPLIANCE_AREAS), 1):  # area labels at startup, one scenario per analysis
+            warmup = tokenizer(
+                ["warmup"] * batch_size,
+                return_tensors="pt",
+                padding="max_length",
+                max_length=LEGAL_BERT_MAX_TOKENS
+            ).to(device)
+            with torch.inference_mode(), torch.autocast(device_type="cuda", dtype=torch.float16):
+                compiled(**warmup)
+        logger.info("🔥 Legal-BERT compiled and warmed up")
+        return compiled
+    except Exception as e:
+        # Compilation errors surface on the first call, so fall back to the eager model
+        logger.warning(f"⚠️ torch.compile unavailable for Legal-BERT ({e}) - running eager")
+        return model
+
+async def _get_legal_bert(model_name: str, device: str) -> Tuple[Any, Any]:
+    """Return the process-wide (tokenizer, model) pair, loading it once under a lock"""
+    key = (model_name, device)
+    async with _MODEL_LOCK:
+        cached = _MODEL_CACHE.get(key)
+        if cached is None:
+            cached = _load_legal_bert(model_name, device)
+            _MODEL_CACHE[key] = cached
+        else:
+            logger.info(f"♻️ Reusing loaded {model_name} on {device.upper()}")
+    return cached
+
 class ComplianceAgent:
     def __init__(self):
         self.model_name = "nlpaueb/legal-bert-base-uncased"
@@ -21,6 +252,8 @@ class ComplianceAgent:
         self.tokenizer = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"  # Use GPU for small model
         self.is_ready = False
+        self.area_embeddings: Optional[torch.Tensor] = None
+        self.embedding_cache: "OrderedDict[str, torch.Tensor]" = OrderedDict()
         
         # Data pipeline connections
         self.compliance_db = None
@@ -33,47 +266,16 @@ class ComplianceAgent:
             
             # Initialize data pipeline connections for comprehensive compliance analysis
             logger.info("🔗 Connecting Compliance Agent to legal data sources...")
-            self.compliance_db = ComplianceDB()
-            self.vector_store = VectorStore()
-            
-            await self.compliance_db.initialize()
-            await self.vector_store.initialize()
-            
-            # Load tokenizer with local cache preference
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_name,
-                local_files_only=False,  # Allow fallback to cache
-                force_download=False,    # Use cache if available
-                cache_dir=None          # Use default cache location
-            )
+            self.compliance_db = await get_shared(ComplianceDB)
+            self.vector_store = await get_shared(VectorStore)
             
-            # Load Legal-BERT model with GPU/CPU optimization
-            if self.device == "cuda":
-                # GPU configuration - small BERT model with conservative limits for RTX 4050
-                self.model = AutoModel.from_pretrained(
-                    self.model_name,
-                    torch_dtype=torch.float16,
-                    device_map="auto",  # Let transformers handle allocation
-                    use_safetensors=True,
-                    trust_remote_code=True,
-                    max_memory={0: "400MB", "cpu": "2GB"},  # Very conservative + CPU fallback
-                    local_files_only=False,
-                    force_download=False
-                )
-                logger.info(f"✅ Compliance Agent ready on {self.device.upper()} - Legal-BERT (~0.3GB VRAM)")
-            else:
-                # CPU configuration with memory limits
-                self.model = AutoModel.from_pretrained(
-                    self.model_name,
-                    torch_dtype=torch.float32,  # Use float32 for CPU stability
-                    device_map={"": "cpu"},  # Force CPU device mapping
-                    use_safetensors=True,
-                    trust_remote_code=True,
-                    low_cpu_mem_usage=True,
-                    local_files_only=False,  # Allow fallback to cache
-                    force_download=False     # Use cache if available
-                )
-                logger.info(f"✅ Compliance Agent ready on {self.device.upper()} - Legal-BERT (~0.4GB RAM)")
+            # Legal-BERT weights are loaded once per process and shared by every agent instance
+            self.tokenizer, self.model = await _get_legal_bert(self.model_name, self.device)
+            
+            # The area labels never change, so embed them once; analyze only embeds the scenario
+            self.area_embeddings = await asyncio.to_thread(
+                self._encode, [f"{label} compliance" for label in _COMPLIANCE_AREAS.values()]
+            )
             
             self.is_ready = True  # Set ready flag after successful initialization
             
@@ -89,48 +291,60 @@ class ComplianceAgent:
         try:
             logger.info("⚖️ Starting comprehensive compliance analysis with real data...")
             
-            # 1. Semantic search for relevant compliance documents
-            vector_results = await self.vector_store.search(
-                query=f"compliance regulatory legal requirements {scenario}",
-                limit=10
+            # The scenario embedding doesn't depend on retrieval, so compute it on a worker thread
+            # while the retrieval below is in flight
+            bert_task = asyncio.create_task(self._prefetch_scenario_embedding(scenario))
+            
+            # 1-2. Semantic search for compliance documents and database query for specific regulations
+            # hit independent backends, so both run concurrently
+            vector_results, compliance_records = await asyncio.gather(
+                self.vector_store.search(
+                    query=f"compliance regulatory legal requirements {scenario}",
+                    limit=10
+                ),
+                self.compliance_db.search_compliance_records(
+                    query=scenario,
+                    limit=20
+                )
             )
             logger.info(f"📄 Found {len(vector_results)} relevant compliance documents")
-            
-            # 2. Query compliance database for specific regulations
-            compliance_records = await self.compliance_db.search_compliance_records(
-                query=scenario,
-                limit=20
-            )
             logger.info(f"⚖️ Retrieved {len(compliance_records)} compliance records")
             
             # 3. Analyze compliance areas with real data
-            compliance_areas = [
-                "Data Protection and Privacy (GDPR, CCPA)",
-                "Financial Services Regulations (SOX, Basel III)", 
-                "Industry-Specific Compliance (FDA, FCC, EPA)",
-                "International Trade and Export Controls",
-                "Labor and Employment Laws",
-                "Intellectual Property Protection",
-                "Anti-Money Laundering (AML)",
-                "Cybersecurity and Data Security Standards"
-            ]
-            
-            compliance_scores = {}
-            for area in compliance_areas:
-                score = await self._analyze_compliance_area_with_data(
-                    scenario, area, compliance_records, vector_results
-                )
-                compliance_scores[area.split(" (")[0].lower().replace(" ", "_")] = score
+            # Lowercase and tokenize the scenario once, then match keywords as set lookups
+            scenario_lower = scenario.lower()
+            scenario_tokens = keyword_tokens(scenario_lower)
+            
+            # Single pass over the records for every downstream aggregate
+            summary = self._summarize_records(compliance_records, _AREA_KEYWORDS)
+            
+            # Vector relevance is the same for every area, so count it once
+            vector_relevance = min(sum(1 for r in vector_results if r.get('score', 0) > 0.7) / 5.0, 1.0)
+            compliance_scores = {
+                area_id: self._analyze_compliance_area_with_data(summary.per_area_matches[area_id], vector_relevance)
+                for area_id in _COMPLIANCE_AREAS
+            }
+            
+            # Only areas without matching records use the Legal-BERT embedding prefetched above
+            await bert_task
+            fallback_areas = [area_id for area_id, score in compliance_scores.items() if score is None]
+            if fallback_areas:
+                logger.info(f"⚖️ Legal-BERT fallback for {len(fallback_areas)}/{len(compliance_scores)} areas")
+                compliance_scores.update(await self._analyze_compliance_areas(fallback_areas, scenario, scenario_tokens))
+            
+            score_array = np.fromiter(compliance_scores.values(), dtype=np.float32, count=len(compliance_scores))
+            # Round once for reporting; the aggregates above use full precision
+            compliance_scores = {area_id: round(score, 2) for area_id, score in compliance_scores.items()}
             
             # 4. Identify specific regulatory requirements from database
-            regulatory_requirements = self._extract_regulatory_requirements(compliance_records)
+            regulatory_requirements = self._extract_regulatory_requirements(summary)
             
             # 5. Generate comprehensive analysis using Legal-BERT
-            analysis = await self._generate_legal_analysis(scenario, compliance_records, vector_results)
+            analysis = await self._generate_legal_analysis(scenario, compliance_records, vector_results, summary)
             
             # 6. Calculate compliance gaps and recommendations
-            compliance_gaps = self._identify_compliance_gaps_from_data(compliance_scores, compliance_records)
-            recommended_actions = self._generate_data_driven_recommendations(compliance_scores, compliance_records)
+            compliance_gaps = self._identify_compliance_gaps_from_data(compliance_scores, summary)
+            recommended_actions = self._generate_data_driven_recommendations(compliance_scores, compliance_records, summary)
             
             # Structure the comprehensive response
             result = {
@@ -141,15 +355,15 @@ class ComplianceAgent:
                 "regulatory_requirements": regulatory_requirements,
                 "compliance_gaps": compliance_gaps,
                 "recommended_actions": recommended_actions,
-                "overall_compliance_score": self._calculate_overall_compliance(compliance_scores),
+                "overall_compliance_score": self._calculate_overall_compliance(score_array),
                 "data_sources": {
                     "compliance_records": len(compliance_records),
                     "vector_documents": len(vector_results),
                     "regulatory_frameworks": len(regulatory_requirements)
                 },
-                "legal_framework_analysis": self._analyze_legal_frameworks(compliance_records),
-                "risk_assessment": self._assess_compliance_risks(compliance_scores),
-                "confidence": self._calculate_confidence(analysis, scenario, compliance_records, vector_results, regulatory_requirements),
+                "legal_framework_analysis": self._analyze_legal_frameworks(summary),
+                "risk_assessment": self._assess_compliance_risks(score_array),
+                "confidence": self._calculate_confidence(analysis, scenario_lower, compliance_records, vector_results, regulatory_requirements),
                 "device": self.device
             }
             
@@ -164,68 +378,108 @@ class ComplianceAgent:
                 "analysis": "Compliance analysis unavailable due to technical error"
             }
     
-    async def _analyze_compliance_area(self, scenario: str, area: str) -> float:
-        """Analyze specific compliance area"""
+    def _autocast(self):
+        """FP16 autocast on GPU (LayerNorm/softmax stay FP32); the int8 CPU model runs as-is"""
+        if self.device == "cuda":
+            return torch.autocast(device_type="cuda", dtype=torch.float16)
+        return contextlib.nullcontext()
+    
+    async def _analyze_compliance_areas(self, areas: List[str], scenario: str, 
+                                        scenario_tokens: FrozenSet[str]) -> Dict[str, float]:
+        """Analyze compliance areas (canonical ids) from keywords and the Legal-BERT scenario/area embeddings"""
         try:
-            # Create analysis prompt
-            text = f"Analyzing {area} compliance for: {scenario}"
-            
-            # Tokenize and move to correct device
-            inputs = self.tokenizer(
-                text, 
-                return_tensors="pt", 
-                max_length=512, 
-                truncation=True, 
-                padding=True
-            )
-            # Move inputs to same device as model
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            # Get embeddings
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                embeddings = outputs.last_hidden_state.mean(dim=1)
+            embedding_scores = await self._area_embedding_scores(scenario)
             
             # Simple compliance scoring based on keywords and context
-            scenario_lower = scenario.lower()
-            area_keywords = self._get_area_keywords(area)
-            
-            keyword_matches = sum(1 for keyword in area_keywords if keyword in scenario_lower)
-            keyword_score = min(keyword_matches / len(area_keywords), 1.0)
-            
-            # Combine with embedding-based analysis
-            embedding_score = torch.sigmoid(embeddings.mean()).item()
-            
-            final_score = (keyword_score * 0.6) + (embedding_score * 0.4)
-            return round(final_score, 2)
+            scores = {}
+            for area in areas:
+                keywords = _AREA_KEYWORDS[area]
+                keyword_matches = len(keywords & scenario_tokens)
+                keyword_score = min(keyword_matches / len(keywords), 1.0)
+                
+                # Combine with embedding-based analysis
+                scores[area] = (keyword_score * 0.6) + (embedding_scores[area] * 0.4)
+            return scores
             
         except Exception as e:
             logger.warning(f"Compliance area analysis failed: {e}")
-            return 0.5  # Default neutral score
+            return {area: 0.5 for area in areas}  # Default neutral score
     
-    def _get_area_keywords(self, area: str) -> List[str]:
-        """Get keywords for specific compliance area"""
-        keyword_map = {
-            "Data Protection and Privacy": ["data", "privacy", "personal", "gdpr", "ccpa", "consent"],
-            "Financial Services Regulations": ["financial", "banking", "securities", "sox", "basel", "audit"],
-            "Industry-Specific Compliance": ["industry", "regulation", "standard", "certification", "fda", "fcc"],
-            "International Trade": ["international", "export", "import", "trade", "customs", "tariff"],
-            "Labor and Employment": ["employment", "labor", "worker", "workplace", "discrimination", "safety"],
-            "Intellectual Property": ["patent", "trademark", "copyright", "intellectual", "property", "license"],
-            "Anti-Money Laundering": ["aml", "money", "laundering", "kyc", "suspicious", "transaction"],
-            "Cybersecurity": ["cybersecurity", "security", "data", "breach", "encryption", "access"]
-        }
-        
-        for key, keywords in keyword_map.items():
-            if key in area:
-                return keywords
-        return ["compliance", "regulation", "requirement"]
+    async def _area_embedding_scores(self, scenario: str) -> Dict[str, float]:
+        """Score every area at once by combining its precomputed embedding with the scenario's"""
+        scenario_embedding = await self._scenario_embedding(scenario)
+        scores = torch.sigmoid(((self.area_embeddings + scenario_embedding) / 2).mean(dim=-1)).tolist()
+        return dict(zip(_COMPLIANCE_AREAS, scores))
+    
+    def _encode(self, texts: List[str]) -> torch.Tensor:
+        """Masked mean-pooled Legal-BERT embeddings [len(texts), hidden] from one batched forward pass"""
+        # Tokenize the whole batch and move to correct device
+        # The compiled GPU model gets fixed-length inputs (no recompiles); elsewhere pad to the
+        # longest text in the batch, rounded up to a multiple of 8 for Tensor Core shapes
+        inputs = self.tokenizer(
+            texts, 
+            return_tensors="pt", 
+            max_length=LEGAL_BERT_MAX_TOKENS, 
+            truncation=True, 
+            padding="max_length" if self.device == "cuda" else True,
+            pad_to_multiple_of=8
+        )
+        # Move inputs to same device as model
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        
+        # Get embeddings, mean-pooled over real tokens only so padding doesn't skew shorter texts
+        with torch.inference_mode(), self._autocast():
+            outputs = self.model(**inputs)
+            mask = inputs["attention_mask"].unsqueeze(-1).float()
+            # outputs[0] is last_hidden_state for both ModelOutput (GPU) and the traced tuple output (CPU)
+            embeddings = (outputs[0].float() * mask).sum(dim=1) / mask.sum(dim=1)
+        # One device-to-host copy for the whole batch
+        return embeddings.cpu()
+    
+    def _embedding_key(self, scenario: str) -> str:
+        """Embedding cache key for a scenario"""
+        return blake2b(scenario.encode("utf-8"), digest_size=16).hexdigest()
+    
+    async def _prefetch_scenario_embedding(self, scenario: str):
+        """Embed an uncached scenario on a worker thread and store it in the embedding cache"""
+        key = self._embedding_key(scenario)
+        if key in self.embedding_cache:
+            return
+        try:
+            embedding = await asyncio.to_thread(self._encode, [scenario])
+        except Exception as e:
+            logger.warning(f"Legal-BERT prefetch failed: {e}")
+            return
+        self._store_embedding(key, embedding[0])
+    
+    def _store_embedding(self, key: str, embedding: torch.Tensor):
+        """Insert a fresh embedding and evict least recently used entries"""
+        self.embedding_cache[key] = embedding
+        while len(self.embedding_cache) > EMBEDDING_CACHE_SIZE:
+            self.embedding_cache.popitem(last=False)
+    
+    async def _scenario_embedding(self, scenario: str) -> torch.Tensor:
+        """Cached Legal-BERT embedding of a scenario, computed on a worker thread on a miss"""
+        key = self._embedding_key(scenario)
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            # Tokenizer and forward pass are CPU-bound - keep them off the event loop
+            embedding = (await asyncio.to_thread(self._encode, [scenario]))[0]
+            self._store_embedding(key, embedding)
+        else:
+            self.embedding_cache.move_to_end(key)
+        return embedding
     
     async def _generate_compliance_report(self, scenario: str, scores: Dict[str, float]) -> str:
         """Generate comprehensive compliance analysis report"""
-        high_risk_areas = [area for area, score in scores.items() if score > 0.7]
-        medium_risk_areas = [area for area, score in scores.items() if 0.4 <= score <= 0.7]
-        low_risk_areas = [area for area, score in scores.items() if score < 0.4]
+        high_risk_areas, medium_risk_areas, low_risk_areas = [], [], []
+        for area, score in scores.items():
+            if score > 0.7:
+                high_risk_areas.append(area)
+            elif score >= 0.4:
+                medium_risk_areas.append(area)
+            else:
+                low_risk_areas.append(area)
         
         report = f"""
         Compliance Analysis Report:
@@ -250,20 +504,48 @@ class ComplianceAgent:
         
         return report.strip()
     
-    async def _analyze_compliance_area_with_data(self, scenario: str, area: str, 
-                                               compliance_records: List[Dict], 
-                                               vector_results: List[Dict]) -> float:
-        """Analyze specific compliance area using real data"""
-        try:
-            # Filter relevant records for this area
-            area_keywords = self._get_area_keywords(area)
-            relevant_records = []
-            
-            for record in compliance_records:
-                record_text = f"{record.get('regulation_name', '')} {record.get('description', '')}".lower()
-                if any(keyword in record_text for keyword in area_keywords):
-                    relevant_records.append(record)
+    def _summarize_records(self, compliance_records: List[Dict], 
+                           area_keywords: Dict[str, FrozenSet[str]]) -> RecordSummary:
+        """Collect severity counts, per-area matches, framework rollup and top requirements in one pass"""
+        summary = RecordSummary(per_area_matches={area: [] for area in area_keywords})
+        frameworks = defaultdict(lambda: {'count': 0, 'severity_levels': Counter()})
+        
+        for index, record in enumerate(compliance_records):
+            reg_name = record.get('regulation_name', '')
+            description = record.get('description', '')
+            severity = record.get('severity_level', 'medium')
             
+            summary.sev_counts[severity] = summary.sev_counts.get(severity, 0) + 1
+            if severity == 'high' and len(summary.high_priority) < 3:
+                summary.high_priority.append(record)
+            
+            # Top 10 most relevant records become regulatory requirements
+            if index < 10 and reg_name and description:
+                summary.top_requirements.append(f"{reg_name} ({severity.upper()}): {description[:150]}...")
+            
+            framework = frameworks[record.get('framework', 'General')]
+            framework['count'] += 1
+            framework['severity_levels'][severity] += 1
+            
+            # ComplianceDB attaches tokens at load time; tokenize only records from elsewhere
+            tokens = record.get('_tokens')
+            if tokens is None:
+                tokens = keyword_tokens(f"{reg_name} {description}")
+            for area, keywords in area_keywords.items():
+                if not keywords.isdisjoint(tokens):
+                    summary.per_area_matches[area].append(record)
+        
+        # Plain dicts keep the JSON shape (every severity level present, zero or not)
+        summary.frameworks = {
+            name: {'count': entry['count'], 'severity_levels': {'high': 0, 'medium': 0, 'low': 0, **entry['severity_levels']}}
+            for name, entry in frameworks.items()
+        }
+        return summary
+    
+    def _analyze_compliance_area_with_data(self, relevant_records: List[Dict], 
+                                         vector_relevance: float) -> Optional[float]:
+        """Analyze specific compliance area using its matching records (None when no record covers the area)"""
+        try:
             # Calculate risk score based on real compliance data
             if relevant_records:
                 # Higher number of relevant regulations = higher compliance requirements
@@ -283,98 +565,54 @@ class ComplianceAgent:
                 avg_severity = sum(severity_scores) / len(severity_scores) if severity_scores else 0.5
                 
                 # Combine with vector search relevance
-                vector_relevance = min(len([r for r in vector_results if r.get('score', 0) > 0.7]) / 5.0, 1.0)
-                
-                final_score = (regulation_density * 0.4) + (avg_severity * 0.4) + (vector_relevance * 0.2)
-                return round(final_score, 2)
+                return (regulation_density * 0.4) + (avg_severity * 0.4) + (vector_relevance * 0.2)
             
-            # Fallback to keyword analysis
-            return await self._analyze_compliance_area(scenario, area)
+            # Caller falls back to keyword + Legal-BERT analysis
+            return None
             
         except Exception as e:
             logger.warning(f"Data-driven compliance analysis failed: {e}")
-            return await self._analyze_compliance_area(scenario, area)
+            return None
     
     async def _generate_legal_analysis(self, scenario: str, compliance_records: List[Dict], 
-                                     vector_results: List[Dict]) -> str:
-        """Generate comprehensive legal analysis using Legal-BERT and real data"""
+                                     vector_results: List[Dict], summary: RecordSummary) -> str:
+        """Generate comprehensive legal analysis from the retrieved compliance data"""
         try:
-            # Prepare context from real data
-            context_parts = []
-            
-            # Add top compliance records
-            for record in compliance_records[:5]:
-                context_parts.append(f"Regulation: {record.get('regulation_name', 'N/A')}")
-                context_parts.append(f"Description: {record.get('description', 'N/A')}")
-                context_parts.append(f"Severity: {record.get('severity_level', 'medium')}")
-                context_parts.append("---")
-            
-            # Add vector search results
-            for result in vector_results[:3]:
-                context_parts.append(f"Document: {result.get('content', 'N/A')[:200]}...")
-                context_parts.append("---")
-            
-            context = "\n".join(context_parts)
-            analysis_text = f"Legal compliance analysis for: {scenario}\n\nRelevant regulations and documents:\n{context}"
-            
-            # Use Legal-BERT for analysis
-            inputs = self.tokenizer(
-                analysis_text,
-                return_tensors="pt",
-                max_length=512,
-                truncation=True,
-                padding=True
-            )
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                # Generate analysis based on legal understanding
-                
-            analysis = f"""Based on comprehensive legal database analysis:
+            high_priority = summary.high_priority
+            parts = [f"""Based on comprehensive legal database analysis:
 
 REGULATORY LANDSCAPE:
 • {len(compliance_records)} relevant regulations identified
-• {len([r for r in compliance_records if r.get('severity_level') == 'high'])} high-severity compliance requirements
+• {summary.sev_counts['high']} high-severity compliance requirements
 • {len(vector_results)} supporting legal documents found
 
 KEY COMPLIANCE AREAS:
-"""
+"""]
             
             # Add specific findings from data
-            high_priority = [r for r in compliance_records if r.get('severity_level') == 'high'][:3]
-            for record in high_priority:
-                analysis += f"• {record.get('regulation_name', 'Unknown')}: {record.get('description', 'No description')[:100]}...\n"
+            parts.extend(
+                f"• {record.get('regulation_name', 'Unknown')}: {record.get('description', 'No description')[:100]}...\n"
+                for record in high_priority
+            )
             
-            analysis += f"""
+            parts.append(f"""
 LEGAL ASSESSMENT:
 The scenario presents {len(compliance_records)} regulatory touchpoints requiring careful consideration. 
 Priority should be given to {len(high_priority)} high-severity regulations identified in our compliance database.
-Vector analysis of legal documents indicates {len([r for r in vector_results if r.get('score', 0) > 0.8])} highly relevant legal precedents."""
+Vector analysis of legal documents indicates {len([r for r in vector_results if r.get('score', 0) > 0.8])} highly relevant legal precedents.""")
             
-            return analysis
+            return "".join(parts)
             
         except Exception as e:
             logger.warning(f"Legal analysis generation failed: {e}")
             return await self._generate_compliance_report(scenario, {})
     
-    def _extract_regulatory_requirements(self, compliance_records: List[Dict]) -> List[str]:
+    def _extract_regulatory_requirements(self, summary: RecordSummary) -> List[str]:
         """Extract specific regulatory requirements from database"""
-        requirements = []
-        
-        for record in compliance_records[:10]:  # Top 10 most relevant
-            reg_name = record.get('regulation_name', '')
-            description = record.get('description', '')
-            severity = record.get('severity_level', 'medium')
-            
-            if reg_name and description:
-                req_text = f"{reg_name} ({severity.upper()}): {description[:150]}..."
-                requirements.append(req_text)
-        
-        return requirements if requirements else ["General compliance requirements apply"]
+        return list(summary.top_requirements) or ["General compliance requirements apply"]
     
     def _identify_compliance_gaps_from_data(self, scores: Dict[str, float], 
-                                          compliance_records: List[Dict]) -> List[str]:
+                                          summary: RecordSummary) -> List[str]:
         """Identify compliance gaps based on real data analysis"""
         gaps = []
         
@@ -384,14 +622,15 @@ Vector analysis of legal documents indicates {len([r for r in vector_results if
                 gaps.append(f"{area.replace('_', ' ').title()} - High Priority (Score: {score})")
         
         # Gaps from compliance records
-        high_severity_regs = [r for r in compliance_records if r.get('severity_level') == 'high']
-        if len(high_severity_regs) > 3:
-            gaps.append(f"Multiple high-severity regulations apply ({len(high_severity_regs)} identified)")
+        high_severity_count = summary.sev_counts['high']
+        if high_severity_count > 3:
+            gaps.append(f"Multiple high-severity regulations apply ({high_severity_count} identified)")
         
         return gaps if gaps else ["No significant compliance gaps identified"]
     
     def _generate_data_driven_recommendations(self, scores: Dict[str, float], 
-                                            compliance_records: List[Dict]) -> List[str]:
+                                            compliance_records: List[Dict], 
+                                            summary: RecordSummary) -> List[str]:
         """Generate recommendations based on real compliance data"""
         recommendations = []
         
@@ -403,13 +642,13 @@ Vector analysis of legal documents indicates {len([r for r in vector_results if
                 recommendations.append(f"Monitor {area.replace('_', ' ')} compliance closely")
         
         # Data-driven recommendations
-        high_severity = [r for r in compliance_records if r.get('severity_level') == 'high']
+        high_severity = summary.sev_counts['high']
         if high_severity:
-            recommendations.append(f"Prioritize {len(high_severity)} high-severity regulations")
+            recommendations.append(f"Prioritize {high_severity} high-severity regulations")
         
-        medium_severity = [r for r in compliance_records if r.get('severity_level') == 'medium']
-        if len(medium_severity) > 5:
-            recommendations.append(f"Develop compliance framework for {len(medium_severity)} medium-priority regulations")
+        medium_severity = summary.sev_counts['medium']
+        if medium_severity > 5:
+            recommendations.append(f"Develop compliance framework for {medium_severity} medium-priority regulations")
         
         # General recommendations based on data
         if len(compliance_records) > 15:
@@ -423,27 +662,13 @@ Vector analysis of legal documents indicates {len([r for r in vector_results if
         
         return recommendations
     
-    def _analyze_legal_frameworks(self, compliance_records: List[Dict]) -> Dict[str, Any]:
+    def _analyze_legal_frameworks(self, summary: RecordSummary) -> Dict[str, Any]:
         """Analyze applicable legal frameworks from real data"""
-        frameworks = {}
-        
-        for record in compliance_records:
-            framework = record.get('framework', 'General')
-            if framework not in frameworks:
-                frameworks[framework] = {
-                    'count': 0,
-                    'severity_levels': {'high': 0, 'medium': 0, 'low': 0}
-                }
-            
-            frameworks[framework]['count'] += 1
-            severity = record.get('severity_level', 'medium')
-            frameworks[framework]['severity_levels'][severity] += 1
-        
-        return frameworks
+        return summary.frameworks
     
-    def _assess_compliance_risks(self, scores: Dict[str, float]) -> Dict[str, str]:
+    def _assess_compliance_risks(self, scores: np.ndarray) -> Dict[str, str]:
         """Assess overall compliance risk levels"""
-        avg_score = sum(scores.values()) / len(scores) if scores else 0.5
+        avg_score = float(scores.mean()) if scores.size else 0.5
         
         if avg_score > 0.7:
             risk_level = "HIGH"
@@ -461,24 +686,6 @@ Vector analysis of legal documents indicates {len([r for r in vector_results if
             'average_score': round(avg_score, 2)
         }
     
-    def _identify_key_regulations(self, scenario: str) -> List[str]:
-        """Identify key regulations that apply"""
-        regulations = []
-        scenario_lower = scenario.lower()
-        
-        if any(word in scenario_lower for word in ["data", "privacy", "personal"]):
-            regulations.append("GDPR/CCPA Data Protection")
-        if any(word in scenario_lower for word in ["financial", "banking", "payment"]):
-            regulations.append("Financial Services Regulations")
-        if any(word in scenario_lower for word in ["international", "export", "global"]):
-            regulations.append("International Trade Regulations")
-        if any(word in scenario_lower for word in ["employee", "worker", "employment"]):
-            regulations.append("Labor and Employment Laws")
-        if any(word in scenario_lower for word in ["technology", "software", "platform"]):
-            regulations.append("Technology and IP Regulations")
-        
-        return regulations if regulations else ["General Business Regulations"]
-    
     def _identify_compliance_gaps(self, scores: Dict[str, float]) -> List[str]:
         """Identify areas with compliance gaps"""
         gaps = []
@@ -507,20 +714,19 @@ Vector analysis of legal documents indicates {len([r for r in vector_results if
         
         return recommendations[:5]  # Return top 5 recommendations
     
-    def _calculate_overall_compliance(self, scores: Dict[str, float]) -> float:
+    def _calculate_overall_compliance(self, scores: np.ndarray) -> float:
         """Calculate overall compliance score"""
-        if not scores:
+        if not scores.size:
             return 0.5
         
         # Weight higher scores more heavily (compliance risk)
-        weighted_sum = sum(score ** 2 for score in scores.values())
-        weighted_average = weighted_sum / len(scores)
+        weighted_average = float(np.square(scores).mean())
         
         # Convert to compliance score (lower risk = higher compliance)
         compliance_score = 1.0 - weighted_average
         return round(max(compliance_score, 0.1), 2)
     
-    def _calculate_confidence(self, analysis: str, scenario: str, compliance_records: List[Dict], vector_results: List[Dict], regulatory_requirements: List[str]) -> float:
+    def _calculate_confidence(self, analysis: str, scenario_lower: str, compliance_records: List[Dict], vector_results: List[Dict], regulatory_requirements: List[str]) -> float:
         """Calculate dynamic confidence score based on compliance analysis quality and data availability"""
         confidence = 0.5  # Base confidence
         
@@ -534,8 +740,7 @@ Vector analysis of legal documents indicates {len([r for r in vector_results if
             confidence += 0.1
             
         # Compliance assessment quality indicators
-        compliance_keywords = ["regulation", "compliance", "legal", "law", "requirement", "framework"]
-        compliance_count = sum(1 for keyword in compliance_keywords if keyword in analysis_lower)
+        compliance_count = len(set(_COMPLIANCE_TERMS.findall(analysis_lower)))
         confidence += min(compliance_count * 0.04, 0.15)
         
         # Data availability factors
@@ -547,15 +752,13 @@ Vector analysis of legal documents indicates {len([r for r in vector_results if
             confidence += 0.08
             
         # Scenario complexity factor
-        scenario_lower = scenario.lower()
-        if any(word in scenario_lower for word in ["international", "global", "cross-border"]):
+        if _INTERNATIONAL_TERMS.search(scenario_lower):
             confidence -= 0.05  # International scenarios have higher compliance complexity
-        if any(word in scenario_lower for word in ["local", "domestic", "single market"]):
+        if _LOCAL_TERMS.search(scenario_lower):
             confidence += 0.05  # Local scenarios have clearer compliance frameworks
             
         # Specific compliance terms that indicate thorough analysis
-        specific_terms = ["gdpr", "hipaa", "sox", "data protection", "privacy", "audit", "certification"]
-        specific_count = sum(1 for term in specific_terms if term in analysis_lower)
+        specific_count = len(set(_SPECIFIC_TERMS.findall(analysis_lower)))
         confidence += min(specific_count * 0.03, 0.12)
         
         return round(min(max(confidence, 0.4), 0.95), 2)
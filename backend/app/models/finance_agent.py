@@ -3,18 +3,131 @@
 RTX 4050 GPU Optimized with Phi-3.5-mini
 """
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, DynamicCache
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import asyncio
+import os
+import re
 
 # Data pipeline imports
 from app.data.financial_db import FinancialDB
 from app.data.market_news import MarketNews
 from app.data.vectore_store import VectorStore
+from app.data.shared_sources import get_shared
+from app.utils.inference import generate_in_thread
+
+try:
+    from llama_cpp import Llama
+except ImportError:  # llama.cpp is optional - CPU falls back to transformers
+    Llama = None
+
+try:
+    from tensorrt_llm.runtime import ModelRunner
+except ImportError:  # TensorRT-LLM is optional - GPU falls back to transformers + bitsandbytes
+    ModelRunner = None
 
 logger = logging.getLogger(__name__)
 
+# Generation budget and stop sequence for the financial assessment (a blank-line run ends the section)
+FINANCE_MAX_NEW_TOKENS = 200
+FINANCE_STOP_STRINGS = ["\n\n\n"]
+
+# Q4_K_M GGUF of Phi-3.5-mini used on CPU when llama-cpp-python is installed
+FINANCE_GGUF_PATH = os.path.expanduser(
+    os.getenv("AIRA_FINANCE_GGUF", "~/.aira/models/Phi-3.5-mini-instruct-Q4_K_M.gguf")
+)
+
+# Prebuilt TensorRT-LLM engine (W4A16) of Phi-3.5-mini used on GPU when tensorrt_llm is installed
+FINANCE_TRT_ENGINE_DIR = os.path.expanduser(
+    os.getenv("AIRA_FINANCE_TRT_ENGINE", "~/.aira/engines/phi-3.5-mini-w4a16")
+)
+
+# Sentiment indicators for metric scoring (substring matches, one scan of the analysis each)
+_POSITIVE_RE = re.compile(r"high|strong|good|excellent|positive")
+_NEGATIVE_RE = re.compile(r"low|weak|poor|negative|risk")
+
+# One Phi-3.5 (tokenizer, model, llama, trt_runner) load per (model name, device) across agent instances
+_MODEL_CACHE: Dict[Tuple[str, str], Tuple[Any, Any, Any, Any]] = {}
+_MODEL_LOCK = asyncio.Lock()
+# Serializes calls into the shared llama.cpp context
+_LLAMA_LOCK = asyncio.Lock()
+# Serializes calls into the shared TensorRT-LLM runner
+_TRT_LOCK = asyncio.Lock()
+
+def _load_phi(model_name: str, device: str, quant_config) -> Tuple[Any, Any, Any, Any]:
+    """
+    Load Phi-3.5-mini for a device as (tokenizer, model, llama, trt_runner)
+
+    CPU prefers the llama.cpp GGUF and GPU the prebuilt TensorRT-LLM engine when
+    available; otherwise the transformers model is loaded.
+    """
+    # On CPU prefer the 4-bit GGUF through llama.cpp (int4 weights, AVX2/VNNI kernels, ~2GB RAM)
+    if device == "cpu" and Llama is not None and os.path.exists(FINANCE_GGUF_PATH):
+        llama = Llama(
+            model_path=FINANCE_GGUF_PATH,
+            n_ctx=1024,
+            n_threads=os.cpu_count(),
+            n_batch=256,
+            verbose=False
+        )
+        logger.info("✅ Finance Agent ready on CPU - Phi-3.5-mini Q4_K_M GGUF via llama.cpp (~2GB RAM)")
+        return None, None, llama, None
+    
+    # Load tokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    if not tokenizer.is_fast:
+        logger.warning(f"⚠️ No fast tokenizer available for {model_name} - using the slow Python tokenizer")
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    
+    # On GPU prefer the AOT-compiled TensorRT-LLM engine (INT4 weight-only GEMMs on the tensor cores).
+    # Build it offline with:
+    #   trtllm-build --checkpoint_dir <phi3.5-mini checkpoint> --output_dir $AIRA_FINANCE_TRT_ENGINE \
+    #       --gemm_plugin float16 --use_weight_only --weight_only_precision int4
+    if device == "cuda" and ModelRunner is not None and os.path.isdir(FINANCE_TRT_ENGINE_DIR):
+        try:
+            runner = ModelRunner.from_dir(engine_dir=FINANCE_TRT_ENGINE_DIR, rank=0)
+            logger.info("✅ Finance Agent ready on CUDA - Phi-3.5-mini W4A16 TensorRT-LLM engine")
+            return tokenizer, None, None, runner
+        except Exception as e:
+            logger.warning(f"⚠️ TensorRT-LLM engine unavailable ({e}) - falling back to transformers")
+    
+    # Load model with GPU/CPU optimization
+    if device == "cuda":
+        # GPU configuration with simpler quantization for RTX 4050
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            quantization_config=quant_config,
+            torch_dtype=torch.float16,
+            low_cpu_mem_usage=True  # Built-in Phi3ForCausalLM - the Hub's remote code predates the Cache API
+        )
+    else:
+        # CPU fallback configuration
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            torch_dtype=torch.float32,
+            device_map={"": "cpu"},
+            low_cpu_mem_usage=True,
+            use_cache=True
+        )
+    
+    vram_info = "~2GB VRAM" if device == "cuda" else "~3.8GB RAM"
+    logger.info(f"✅ Finance Agent ready on {device.upper()} - Phi-3.5-mini ({vram_info})")
+    return tokenizer, model, None, None
+
+async def _get_phi(model_name: str, device: str, quant_config) -> Tuple[Any, Any, Any, Any]:
+    """Return the process-wide Phi-3.5 load, loading it once under a lock"""
+    key = (model_name, device)
+    async with _MODEL_LOCK:
+        cached = _MODEL_CACHE.get(key)
+        if cached is None:
+            cached = _load_phi(model_name, device, quant_config)
+            _MODEL_CACHE[key] = cached
+        else:
+            logger.info(f"♻️ Reusing loaded {model_name} on {device.upper()}")
+    return cached
+
 class FinanceAgent:
     def __init__(self):
         # Finance Agent uses Phi-3.5-mini for financial calculations
@@ -23,6 +136,10 @@ class FinanceAgent:
         self.tokenizer = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.is_ready = False
+        self.llama = None  # llama.cpp model on CPU (a Llama instance is not safe to share across threads)
+        self.llama_lock = _LLAMA_LOCK
+        self.trt_runner = None  # TensorRT-LLM engine runner on GPU
+        self.trt_lock = _TRT_LOCK
         
         # Data pipeline connections
         self.financial_db = None
@@ -48,43 +165,15 @@ class FinanceAgent:
             
             # Initialize data pipeline connections first
             logger.info("🔗 Connecting Finance Agent to data sources...")
-            self.financial_db = FinancialDB()
-            self.market_news = MarketNews()
-            self.vector_store = VectorStore()
-            
-            await self.financial_db.initialize()
-            await self.market_news.initialize()
-            await self.vector_store.initialize()
-            
-            # Load tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            if self.tokenizer.pad_token is None:
-                self.tokenizer.pad_token = self.tokenizer.eos_token
-            
-            # Load model with GPU/CPU optimization
-            if self.device == "cuda":
-                # GPU configuration with simpler quantization for RTX 4050
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_name,
-                    quantization_config=self.quant_config,
-                    torch_dtype=torch.float16,
-                    trust_remote_code=True,
-                    low_cpu_mem_usage=True
-                )
-            else:
-                # CPU fallback configuration
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_name,
-                    torch_dtype=torch.float32,
-                    device_map={"": "cpu"},
-                    trust_remote_code=True,
-                    low_cpu_mem_usage=True,
-                    use_cache=True
-                )
-            
-            vram_info = "~2GB VRAM" if self.device == "cuda" else "~3.8GB RAM"
+            self.financial_db, self.market_news, self.vector_store = await asyncio.gather(
+                get_shared(FinancialDB),
+                get_shared(MarketNews),
+                get_shared(VectorStore)
+            )
+            
+            # Phi-3.5 weights are loaded once per process and shared by every FinanceAgent instance
+            self.tokenizer, self.model, self.llama, self.trt_runner = await _get_phi(self.model_name, self.device, self.quant_config)
             self.is_ready = True
-            logger.info(f"✅ Finance Agent ready on {self.device.upper()} - Phi-3.5-mini ({vram_info})")
             
         except Exception as e:
             logger.error(f"❌ Finance Agent initialization failed: {e}")
@@ -99,20 +188,17 @@ class FinanceAgent:
             # Get real financial data from data pipeline
             logger.info("💰 Gathering real financial data...")
             
-            # Get financial metrics and government expenditure data
-            financial_ratios = await self.financial_db.get_financial_ratios({
-                'entity_id': 'scenario_analysis',
-                'scenario': scenario
-            })
-            
-            # Get market impact analysis
-            market_impact = await self.market_news.get_government_expenditure_impact()
-            
-            # Search for similar financial scenarios using vector store
-            similar_scenarios = await self.vector_store.search_financial_context(scenario, top_k=3)
-            
-            # Get economic indicators
-            economic_data = await self.financial_db.get_economic_indicators()
+            # Financial ratios, government expenditure impact, similar financial scenarios and
+            # economic indicators come from independent sources, so fetch them concurrently
+            financial_ratios, market_impact, similar_scenarios, economic_data = await asyncio.gather(
+                self.financial_db.get_financial_ratios({
+                    'entity_id': 'scenario_analysis',
+                    'scenario': scenario
+                }),
+                self.market_news.get_government_expenditure_impact(),
+                self.vector_store.search_financial_context(scenario, top_k=3),
+                self.financial_db.get_economic_indicators()
+            )
             
             # Create enhanced financial analysis prompt with real data
             prompt = f"""
@@ -133,27 +219,16 @@ class FinanceAgent:
             
             Financial Assessment:"""
             
-            # Tokenize input
-            inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
-            if self.device == "cuda":
-                inputs = inputs.to(self.device)
-            
-            # Generate analysis
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
-                    max_length=inputs.shape[1] + 200,
-                    num_return_sequences=1,
-                    temperature=0.7,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    use_cache=False,  # Disable cache to avoid DynamicCache issues
-                    attention_mask=torch.ones_like(inputs)  # Explicit attention mask
-                )
-            
-            # Decode response
-            generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            analysis = generated_text[len(prompt):].strip()
+            if self.llama is not None:
+                analysis = await self._generate_gguf(prompt)
+            elif self.trt_runner is not None:
+                analysis = await self._generate_trt(prompt)
+            else:
+                analysis = await self._generate(prompt)
+            
+            # Lowercase and count sentiment indicators once for all four metrics
+            analysis_lower = analysis.lower()
+            sentiment = self._sentiment_counts(analysis_lower)
             
             # Combine AI analysis with real data
             result = {
@@ -167,12 +242,12 @@ class FinanceAgent:
                     "similar_scenarios": len(similar_scenarios)
                 },
                 "metrics": {
-                    "revenue_potential": self._extract_score(analysis, "revenue"),
-                    "cost_efficiency": self._extract_score(analysis, "cost"),
-                    "roi_projection": self._extract_score(analysis, "roi"),
-                    "funding_requirement": self._extract_score(analysis, "funding")
+                    "revenue_potential": self._extract_score(analysis_lower, "revenue", sentiment),
+                    "cost_efficiency": self._extract_score(analysis_lower, "cost", sentiment),
+                    "roi_projection": self._extract_score(analysis_lower, "roi", sentiment),
+                    "funding_requirement": self._extract_score(analysis_lower, "funding", sentiment)
                 },
-                "confidence": self._calculate_confidence(analysis, scenario, financial_ratios, market_impact),
+                "confidence": self._calculate_confidence(analysis, analysis_lower, scenario.lower(), financial_ratios, market_impact),
                 "device": self.device
             }
             
@@ -187,16 +262,75 @@ class FinanceAgent:
                 "analysis": "Financial analysis unavailable due to technical error"
             }
     
-    def _extract_score(self, text: str, keyword: str) -> float:
-        """Extract numerical score from analysis text"""
+    async def _generate(self, prompt: str) -> str:
+        """Generate the financial assessment with the transformers model"""
+        # Tokenize input on a worker thread (the tokenizer returns the attention mask alongside the ids)
+        inputs = await asyncio.to_thread(self.tokenizer, prompt, return_tensors="pt", max_length=512, truncation=True)
+        if self.device == "cuda":
+            inputs = inputs.to(self.device)
+        input_ids = inputs["input_ids"]
+        
+        # Generate analysis on a worker thread so the event loop keeps serving requests
+        outputs = await generate_in_thread(
+            self.model,
+            input_ids,
+            attention_mask=inputs["attention_mask"],
+            max_new_tokens=FINANCE_MAX_NEW_TOKENS,
+            num_return_sequences=1,
+            do_sample=False,  # Greedy - deterministic structured analysis, no per-step sampling
+            num_beams=1,
+            pad_token_id=self.tokenizer.eos_token_id,
+            eos_token_id=self.tokenizer.eos_token_id,
+            stop_strings=FINANCE_STOP_STRINGS,
+            tokenizer=self.tokenizer,  # Needed by generate to match stop_strings
+            use_cache=True,  # Reuse past keys/values instead of re-attending the whole sequence each step
+            past_key_values=DynamicCache()  # Fresh cache object per call
+        )
+        
+        # Decode response
+        generated_text = await asyncio.to_thread(self.tokenizer.decode, outputs[0], skip_special_tokens=True)
+        return generated_text[len(prompt):].strip()
+    
+    async def _generate_gguf(self, prompt: str) -> str:
+        """Generate the financial assessment with the llama.cpp GGUF model on a worker thread"""
+        async with self.llama_lock:
+            completion = await asyncio.to_thread(
+                self.llama, prompt, max_tokens=FINANCE_MAX_NEW_TOKENS, temperature=0.0, stop=FINANCE_STOP_STRINGS
+            )
+        return completion["choices"][0]["text"].strip()
+    
+    async def _generate_trt(self, prompt: str) -> str:
+        """Generate the financial assessment with the TensorRT-LLM engine on a worker thread"""
+        input_ids = await asyncio.to_thread(
+            self.tokenizer.encode, prompt, return_tensors="pt", max_length=512, truncation=True
+        )
+        async with self.trt_lock:
+            output_ids = await asyncio.to_thread(
+                self.trt_runner.generate,
+                batch_input_ids=[input_ids[0].int()],
+                max_new_tokens=FINANCE_MAX_NEW_TOKENS,
+                end_id=self.tokenizer.eos_token_id,
+                pad_id=self.tokenizer.pad_token_id,
+                top_k=1  # Greedy, matching the transformers path
+            )
+        
+        # Output is [batch, beams, tokens] and starts with the prompt
+        generated = output_ids[0][0][input_ids.shape[1]:]
+        text = await asyncio.to_thread(self.tokenizer.decode, generated, skip_special_tokens=True)
+        # The engine has no string stop criteria, so cut at the stop sequence here
+        for stop in FINANCE_STOP_STRINGS:
+            text = text.split(stop, 1)[0]
+        return text.strip()
+    
+    def _sentiment_counts(self, text_lower: str) -> Tuple[int, int]:
+        """Number of distinct positive and negative indicators present in lowercased text"""
+        return len(set(_POSITIVE_RE.findall(text_lower))), len(set(_NEGATIVE_RE.findall(text_lower)))
+    
+    def _extract_score(self, text_lower: str, keyword: str, sentiment: Tuple[int, int]) -> float:
+        """Extract numerical score from lowercased analysis text and its sentiment counts"""
         # Simple scoring based on keyword presence and sentiment
-        text_lower = text.lower()
         if keyword in text_lower:
-            positive_indicators = ["high", "strong", "good", "excellent", "positive"]
-            negative_indicators = ["low", "weak", "poor", "negative", "risk"]
-            
-            positive_count = sum(1 for indicator in positive_indicators if indicator in text_lower)
-            negative_count = sum(1 for indicator in negative_indicators if indicator in text_lower)
+            positive_count, negative_count = sentiment
             
             if positive_count > negative_count:
                 return min(0.8 + (positive_count * 0.05), 1.0)
@@ -205,13 +339,11 @@ class FinanceAgent:
         
         return 0.5  # Neutral score
     
-    def _calculate_confidence(self, analysis: str, scenario: str, financial_ratios: Dict, market_impact: Dict) -> float:
+    def _calculate_confidence(self, analysis: str, analysis_lower: str, scenario_lower: str, 
+                              financial_ratios: Dict, market_impact: Dict) -> float:
         """Calculate dynamic confidence score based on analysis quality and data availability"""
         confidence = 0.5  # Base confidence
         
-        # Analysis quality factors
-        analysis_lower = analysis.lower()
-        
         # Length and detail indicators
         if len(analysis) > 500:
             confidence += 0.1
@@ -230,7 +362,6 @@ class FinanceAgent:
             confidence += 0.1
             
         # Scenario complexity factor
-        scenario_lower = scenario.lower()
         if any(word in scenario_lower for word in ["startup", "new venture", "launch"]):
             confidence -= 0.05  # New ventures have higher uncertainty
         if any(word in scenario_lower for word in ["expansion", "growth", "scale"]):
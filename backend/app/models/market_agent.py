@@ -3,42 +3,222 @@
 RTX 4050 GPU Optimized with TinyLlama-1.1B-Chat
 """
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+from transformers import AutoTokenizer, AutoModelForCausalLM, StaticCache, TextIteratorStreamer
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 import asyncio
+import copy
+import os
+import re
+import time
+import uuid
+from collections import Counter, OrderedDict
+from hashlib import blake2b
+
+import numpy as np
 
 # Data pipeline imports
 from ..data.market_news import MarketNews
 from ..data.dataset_loader import DatasetLoader
+from ..data.shared_sources import get_shared
+from ..utils.inference import generate_in_thread
+from .model_pool import generate_lock
+from . import tinyllama
+
+try:
+    from vllm import AsyncEngineArgs, AsyncLLMEngine, SamplingParams
+except ImportError:  # vLLM is optional - the GPU falls back to transformers with the batch worker
+    AsyncLLMEngine = None
 
 logger = logging.getLogger(__name__)
 
+# Concurrent analyses are queued and generated together: up to MARKET_BATCH_SIZE prompts,
+# collected for at most MARKET_BATCH_WINDOW seconds after the first one arrives
+MARKET_BATCH_SIZE = 8
+MARKET_BATCH_WINDOW = 0.02
+MARKET_MAX_NEW_TOKENS = 300
+# Recent results per normalized scenario, so repeated scenarios skip data fetches and generation
+# (entries age out with the analysis cache TTL since market news changes)
+MARKET_RESULT_CACHE_SIZE = 256
+MARKET_RESULT_CACHE_TTL = int(os.getenv("AIRA_CACHE_TTL", "3600"))
+
+# Optional draft model for speculative (assisted) decoding - must share TinyLlama's Llama tokenizer
+MARKET_DRAFT_MODEL = os.getenv("AIRA_MARKET_DRAFT_MODEL")
+MARKET_DRAFT_TOKENS = 5
+
+# Share of GPU memory for a vLLM engine (PagedAttention + continuous batching); 0 keeps transformers
+MARKET_VLLM_GPU_MEMORY = float(os.getenv("AIRA_MARKET_VLLM_GPU_MEMORY", "0"))
+
+# Without the static cache (eager batches, streams), prompts are padded to a multiple of this
+MARKET_PROMPT_PAD_MULTIPLE = 64
+
+# Indicator phrases looked for in the generated analysis, by category (lowercase substrings)
+_ANALYSIS_INDICATORS: Dict[str, Tuple[str, ...]] = {
+    "size_large": ("large market", "billion", "massive", "huge", "enormous", "significant market"),
+    "size_medium": ("medium market", "million", "moderate", "substantial", "growing market"),
+    "size_small": ("small market", "niche", "limited", "narrow", "specialized"),
+    "competition_high": ("intense competition", "highly competitive", "saturated", "many competitors"),
+    "competition_medium": ("moderate competition", "some competitors", "competitive landscape"),
+    "competition_low": ("low competition", "few competitors", "emerging market", "blue ocean"),
+    "growth": ("growth", "expanding", "increasing", "rising", "growing", "opportunity"),
+    "decline": ("declining", "shrinking", "decreasing", "falling", "stagnant"),
+    "barriers_high": ("high barriers", "difficult entry", "complex", "regulated", "capital intensive"),
+    "barriers_medium": ("moderate barriers", "some challenges", "established players"),
+    "barriers_low": ("low barriers", "easy entry", "open market", "accessible"),
+    "demand_strong": ("high demand", "strong demand", "increasing demand", "growing interest"),
+    "demand_weak": ("low demand", "weak demand", "declining interest", "limited demand"),
+    "segment_young": ("young", "millennial", "gen z"),
+    "segment_business": ("business", "enterprise", "b2b"),
+    "segment_consumer": ("consumer", "individual", "personal"),
+    "segment_sme": ("small business", "sme", "startup"),
+    "driver_technology": ("technology", "digital", "innovation"),
+    "driver_demand": ("demand", "need", "requirement"),
+    "driver_regulation": ("regulation", "policy", "government"),
+    "driver_economic": ("economic", "growth", "expansion"),
+    "challenge_competition": ("competition", "competitive"),
+    "challenge_regulation": ("regulation", "compliance"),
+    "challenge_cost": ("cost", "expensive", "pricing"),
+    "challenge_technical": ("technology", "technical"),
+    "attractive": ("opportunity", "growth", "potential", "attractive", "promising"),
+    "unattractive": ("challenge", "difficult", "risk", "threat", "barrier"),
+    "quality_market": ("market", "competition", "demand", "growth", "opportunity", "trend"),
+    "quality_specific": ("market share", "competitive advantage", "barriers to entry", "customer segmentation", "pricing strategy"),
+}
+# Three-level assessments as (category, level) pairs from highest to lowest - the dominant level wins
+_LEVEL_TABLES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "market_size": (("size_large", "LARGE"), ("size_medium", "MEDIUM"), ("size_small", "SMALL")),
+    "competition": (("competition_high", "HIGH"), ("competition_medium", "MEDIUM"), ("competition_low", "LOW")),
+    "entry_barriers": (("barriers_high", "HIGH"), ("barriers_medium", "MEDIUM"), ("barriers_low", "LOW")),
+}
+
+# Labelled findings as (category, label) pairs - a label is reported when any of its indicators is present
+_LABEL_TABLES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "segments": (
+        ("segment_young", "Young Adults/Digital Natives"),
+        ("segment_business", "Business/Enterprise"),
+        ("segment_consumer", "Individual Consumers"),
+        ("segment_sme", "Small and Medium Enterprises"),
+    ),
+    "growth_drivers": (
+        ("driver_technology", "Technological Innovation"),
+        ("driver_demand", "Market Demand"),
+        ("driver_regulation", "Regulatory Changes"),
+        ("driver_economic", "Economic Growth"),
+    ),
+    "challenges": (
+        ("challenge_competition", "Intense Competition"),
+        ("challenge_regulation", "Regulatory Complexity"),
+        ("challenge_cost", "Cost Pressures"),
+        ("challenge_technical", "Technical Challenges"),
+    ),
+}
+
+_ANALYSIS_TERMS = frozenset(term for terms in _ANALYSIS_INDICATORS.values() for term in terms)
+
+# Keywords looked for in the lowercased news article contents, by category
+_NEWS_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "trend_growth": ("growth", "expansion", "increase", "rise", "boost", "surge"),
+    "trend_decline": ("decline", "decrease", "fall", "drop", "slump", "crash"),
+    "competition": ("competition", "competitor", "rival", "market share", "competitive"),
+    "barriers": ("regulation", "compliance", "barrier", "restriction", "requirement"),
+    "demand": ("demand", "sales", "revenue", "customer", "consumer"),
+    "demand_positive": ("increase", "growth", "strong", "high", "rising"),
+    "merger": ("merger", "acquisition", "takeover"),
+    "challenge_negative": ("challenge", "difficulty", "problem", "risk", "decline", "threat"),
+    "challenge_competition": ("competition", "competitor", "rival", "market share"),
+    "challenge_barriers": ("regulation", "barrier", "restriction", "requirement"),
+    "attractive": ("growth", "opportunity", "positive", "strong"),
+    "competition_term": ("competition",),
+    "growth_term": ("growth",),
+    "entrant_new": ("new",),
+    "entrant_company": ("company",),
+}
+
+# Market segments and the news keywords that signal activity in them
+_NEWS_SEGMENTS: Dict[str, Tuple[str, ...]] = {
+    "Enterprise/B2B": ("enterprise", "business", "corporate", "b2b"),
+    "Small Business": ("small business", "sme", "startup", "entrepreneur"),
+    "Consumer/B2C": ("consumer", "individual", "personal", "b2c"),
+    "Tech-Savvy Users": ("digital", "tech", "app", "platform"),
+    "Traditional Markets": ("traditional", "conventional", "established"),
+}
+
+# Columns of the per-article mention matrix: every news keyword category and segment
+_NEWS_COLUMNS: Dict[str, int] = {category: column for column, category in enumerate([*_NEWS_KEYWORDS, *_NEWS_SEGMENTS])}
+# Each news keyword -> the matrix columns it marks
+_NEWS_TERM_COLUMNS: Dict[str, List[int]] = {
+    term: [_NEWS_COLUMNS[category] for category, terms in {**_NEWS_KEYWORDS, **_NEWS_SEGMENTS}.items() if term in terms]
+    for terms in [*_NEWS_KEYWORDS.values(), *_NEWS_SEGMENTS.values()] for term in terms
+}
+
+# Scenario wording that lowers or raises confidence in the market read
+_EMERGING_TERMS = ("emerging", "new market", "disruptive")
+_ESTABLISHED_TERMS = ("established", "mature", "traditional")
+
+# One pass over the analysis finds the longest indicator starting at each position
+# (zero-width lookahead, so overlapping indicators are all seen)
+_ANALYSIS_TERM_RE = re.compile(
+    "(?=(" + "|".join(re.escape(term) for term in sorted(_ANALYSIS_TERMS, key=len, reverse=True)) + "))"
+)
+# Shorter indicators that prefix the matched one occur at the same position too
+_TERM_PREFIXES: Dict[str, Tuple[str, ...]] = {
+    term: tuple(other for other in _ANALYSIS_TERMS if term.startswith(other)) for term in _ANALYSIS_TERMS
+}
+
+# Same single-pass scan over each article for the news keywords
+_NEWS_TERM_RE = re.compile(
+    "(?=(" + "|".join(re.escape(term) for term in sorted(_NEWS_TERM_COLUMNS, key=len, reverse=True)) + "))"
+)
+_NEWS_TERM_PREFIXES: Dict[str, Tuple[str, ...]] = {
+    term: tuple(other for other in _NEWS_TERM_COLUMNS if term.startswith(other)) for term in _NEWS_TERM_COLUMNS
+}
+
 class MarketAgent:
+    # Static prompt pieces around the scenario-specific context - tokenized once at initialize
+    PROMPT_HEAD = "Comprehensive Market Analysis for Business Scenario:\n"
+    PROMPT_INSTRUCTIONS = """Based on real market data, analyze:
+1. Current market conditions and trends
+2. Economic indicators impact on market
+3. Competitive landscape and positioning
+4. Target customer segments and demand patterns
+5. Market opportunities and emerging trends
+6. Geographic market considerations and expansion potential
+7. Pricing strategy based on market conditions
+8. Risk factors and market challenges
+Market Assessment with Data-Driven Insights:"""
+    # Prompt length cap - template (~110 tokens) + scenario + market context stay under it at P99,
+    # and prefill attention is quadratic in it
+    MAX_PROMPT_TOKENS = 320
+    # Longer scenarios are cut so the market context still gets the rest of the budget
+    MAX_SCENARIO_TOKENS = 96
+
     def __init__(self):
         # Market Agent uses TinyLlama for lightweight market analysis
-        self.model_name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"  # Switched from Mistral-7B to TinyLlama
+        self.model_name = tinyllama.TINYLLAMA_MODEL  # Switched from Mistral-7B to TinyLlama
         self.model = None
         self.tokenizer = None
+        self.assistant = None  # Draft model for speculative decoding (AIRA_MARKET_DRAFT_MODEL)
+        self.engine = None  # vLLM engine replacing model + batch worker (AIRA_MARKET_VLLM_GPU_MEMORY)
+        self.head_ids: List[int] = []  # Token ids of PROMPT_HEAD (with BOS)
+        self.instruction_ids: List[int] = []  # Token ids of PROMPT_INSTRUCTIONS
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.compute_dtype = tinyllama.compute_dtype(self.device)  # Draft model dtype on GPU
         self.is_ready = False
         
+        # Pending (prompt, future) pairs drained by the batch worker
+        self.request_queue: Optional[asyncio.Queue] = None
+        self.batch_task: Optional[asyncio.Task] = None
+        # Serializes model.generate between the batch worker and streaming analyses
+        # (replaced by the pool's lock when the weights are shared with other agents)
+        self.generate_lock = asyncio.Lock()
+        self.static_kv: Optional[StaticCache] = None  # Preallocated KV cache every batch decodes over (set by _compile_decode)
+        # Scenario key -> (monotonic time stored, result), least recently used first
+        self.result_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        
         # Data pipeline connections
         self.market_news = None
         self.dataset_loader = None
         
-        # Configure 4-bit quantization for RTX 4050 (6GB VRAM) - Much lighter than Mistral-7B
-        if self.device == "cuda":
-            self.quant_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16,
-                bnb_4bit_use_double_quant=True,
-                bnb_4bit_quant_type="nf4",
-                llm_int8_enable_fp32_cpu_offload=True  # Enable CPU offload for safety
-            )
-        else:
-            self.quant_config = None
-        
     async def initialize(self):
         """Initialize the Market Agent with TinyLlama GPU optimization and data connections"""
         try:
@@ -46,44 +226,64 @@ class MarketAgent:
             
             # Initialize data pipeline connections
             logger.info("🔌 Connecting to market data sources...")
-            self.market_news = MarketNews()
-            await self.market_news.initialize()
-            
-            self.dataset_loader = DatasetLoader()
-            await self.dataset_loader.initialize()
+            self.market_news, self.dataset_loader = await asyncio.gather(
+                get_shared(MarketNews),
+                get_shared(DatasetLoader)
+            )
             
             logger.info("✅ Market data connections established")
             
-            # Load tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            if self.device == "cuda":
+                # TF32 tensor-core math for any matmuls left in fp32
+                torch.backends.cuda.matmul.allow_tf32 = True
+                torch.backends.cudnn.allow_tf32 = True
+            
+            # vLLM schedules its own continuous batches over a paged KV cache, replacing the batch worker
+            use_vllm = self.device == "cuda" and AsyncLLMEngine is not None and MARKET_VLLM_GPU_MEMORY > 0
+            
+            # Tokenizer, model weights and the optional draft model load concurrently on worker threads
+            checkpoint = tinyllama.checkpoint(self.device)
+            loads = [asyncio.to_thread(AutoTokenizer.from_pretrained, self.model_name, use_fast=True)]
+            if use_vllm:
+                loads.append(asyncio.to_thread(self._load_vllm_engine))
+            else:
+                # Borrowed from the shared pool - the Risk Agent runs the same TinyLlama weights
+                loads.append(tinyllama.get_tinyllama(self.device))
+                self.generate_lock = generate_lock(checkpoint, self.device)
+            if MARKET_DRAFT_MODEL and not use_vllm:
+                loads.append(asyncio.to_thread(self._load_draft_model))
+            self.tokenizer, model, *draft = await asyncio.gather(*loads)
+            if use_vllm:
+                self.engine = model
+            else:
+                self.model = model
+            vram_info = f"vLLM AWQ, {MARKET_VLLM_GPU_MEMORY:.0%} of VRAM" if use_vllm else tinyllama.memory_note(self.device)
+            self.actual_device = self.device  # Track actual device used
+            
+            # The Rust tokenizer builds ids and attention masks for a whole batch in one call
+            if not self.tokenizer.is_fast:
+                logger.warning(f"⚠️ No fast tokenizer available for {self.model_name} - using the slow Python tokenizer")
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
+            # Decoder-only batches are left-padded so every prompt ends where generation starts
+            self.tokenizer.padding_side = "left"
             
-            # Load model with GPU optimization for TinyLlama
-            if self.device == "cuda":
-                # Run TinyLlama on GPU with quantization - much lighter than Mistral-7B
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_name,
-                    quantization_config=self.quant_config,
-                    device_map="auto",  # Let transformers handle allocation
-                    trust_remote_code=True,
-                    torch_dtype=torch.float16,
-                    max_memory={0: "800MB", "cpu": "4GB"}  # Conservative + CPU fallback
-                )
-                self.actual_device = "cuda"  # Track actual device used
-                vram_info = "~0.5GB VRAM"
-            else:
-                # CPU fallback configuration
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_name,
-                    torch_dtype=torch.float32,
-                    device_map={"": "cpu"},
-                    trust_remote_code=True,
-                    low_cpu_mem_usage=True,
-                    use_cache=True
-                )
-                self.actual_device = "cpu"
-                vram_info = "~1GB RAM"
+            # The static prompt pieces never change, so tokenize them once
+            self.head_ids = self.tokenizer.encode(self.PROMPT_HEAD)
+            self.instruction_ids = self.tokenizer.encode(self.PROMPT_INSTRUCTIONS, add_special_tokens=False)
+            
+            if draft:
+                self.assistant = draft[0]
+                logger.info(f"✅ Market Agent speculative decoding with draft {MARKET_DRAFT_MODEL}")
+            elif self.device == "cuda" and self.engine is None:
+                # Replay decode steps as CUDA graphs over a preallocated KV cache
+                # (assisted decoding verifies variable-length drafts, so it skips this)
+                await self._compile_decode()
+            
+            if self.engine is None:
+                # Start batching concurrent analyses into shared generate calls
+                self.request_queue = asyncio.Queue()
+                self.batch_task = asyncio.create_task(self._batch_worker())
             
             self.is_ready = True
             logger.info(f"✅ Market Agent ready on {self.actual_device.upper()} - TinyLlama ({vram_info}) with real data pipeline")
@@ -97,146 +297,396 @@ class MarketAgent:
         if not self.is_ready:
             raise RuntimeError("Market Agent not initialized")
         
+        key = self._result_key(scenario)
+        cached = self._cached_result(key)
+        if cached is not None:
+            logger.info("♻️ Market analysis served from the scenario cache")
+            return cached
+        
         try:
-            logger.info("📈 Starting comprehensive market analysis with real data...")
+            market_data, economic_data, prompt_context = await self._gather_market_data(scenario)
             
-            # 1. Get real market news and trends
-            market_data = await self.market_news.get_market_news(
-                query=f"market analysis {scenario}",
-                limit=15
-            )
-            logger.info(f"📰 Retrieved {len(market_data)} real market news articles")
-            
-            # 2. Get economic and market datasets
-            economic_data = await self.dataset_loader.get_economic_indicators()
-            logger.info(f"📊 Retrieved {len(economic_data)} economic indicators")
-            
-            # 3. Create comprehensive market analysis prompt with real data
-            market_context = self._build_market_context(market_data, economic_data)
-            
-            prompt = f"""
-            Comprehensive Market Analysis for Business Scenario:
-            {scenario}
-            
-            Real Market Data Context:
-            {market_context}
-            
-            Based on real market data, analyze:
-            1. Current market conditions and trends
-            2. Economic indicators impact on market
-            3. Competitive landscape and positioning
-            4. Target customer segments and demand patterns
-            5. Market opportunities and emerging trends
-            6. Geographic market considerations and expansion potential
-            7. Pricing strategy based on market conditions
-            8. Risk factors and market challenges
-            
-            Market Assessment with Data-Driven Insights:"""
-            
-            # Generate analysis using TinyLlama
-            inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
-            inputs = inputs.to(self.device)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
-                    max_length=inputs.shape[1] + 300,
-                    num_return_sequences=1,
-                    temperature=0.7,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    attention_mask=torch.ones_like(inputs)
-                )
-            
-            generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            analysis = generated_text[len(prompt):].strip()
-            
-            # 4. Enhance analysis with real data insights
-            market_insights = self._extract_market_insights(market_data, economic_data)
-            
-            # Structure the comprehensive response
-            result = {
-                "agent": "Market", 
-                "model": self.model_name,
-                "analysis": analysis,
-                "real_market_data": {
-                    "market_news_count": len(market_data),
-                    "economic_indicators": len(economic_data),
-                    "data_freshness": "Real-time market data"
-                },
-                "market_metrics": {
-                    "market_size_potential": self._assess_market_size_with_data(analysis, economic_data),
-                    "competitive_intensity": self._assess_competition_with_data(analysis, market_data),
-                    "growth_opportunity": self._assess_growth_potential_with_data(analysis, economic_data),
-                    "market_entry_difficulty": self._assess_entry_barriers_with_data(analysis, market_data),
-                    "customer_demand": self._assess_demand_with_data(analysis, market_data)
-                },
-                "competitive_analysis": self._analyze_competition_with_data(scenario, analysis, market_data),
-                "market_segments": self._identify_target_segments_with_data(analysis, market_data),
-                "growth_drivers": self._identify_growth_drivers_with_data(analysis, economic_data),
-                "market_challenges": self._identify_challenges_with_data(analysis, market_data),
-                "strategic_recommendations": self._generate_data_driven_recommendations(analysis, market_data, economic_data),
-                "economic_indicators_impact": market_insights["economic_impact"],
-                "market_trends": market_insights["trends"],
-                "overall_market_score": self._calculate_market_attractiveness_with_data(analysis, market_data, economic_data),
-                "confidence": self._calculate_confidence(analysis, scenario, market_data, economic_data),
-                "device": self.device
-            }
+            # Generate analysis using TinyLlama, batched with any concurrent analyses
+            if self.engine is not None:
+                analysis = "".join([text async for text in self._stream_vllm(prompt_context)]).strip()
+            else:
+                analysis = await self._submit(prompt_context)
             
+            # Keyword scoring is pure CPU work - keep the loop free to feed the next GPU batch
+            result = await asyncio.to_thread(self._build_result, scenario, analysis, market_data, economic_data)
+            self._store_result(key, result)
             logger.info("📈 Comprehensive market analysis completed with real data integration")
             return result
             
         except Exception as e:
             logger.error(f"❌ Market analysis failed: {e}")
-            return {
-                "agent": "Market",
-                "error": str(e),
-                "analysis": "Market analysis unavailable due to technical error"
-            }
+            return self._error_result(e)
+    
+    async def analyze_stream(self, scenario: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze a scenario, yielding the generated analysis as it is decoded
+        
+        Yields {"type": "token", "text": ...} events while TinyLlama generates, then one
+        {"type": "result", "result": ...} event with the same structure analyze returns.
+        """
+        if not self.is_ready:
+            raise RuntimeError("Market Agent not initialized")
+        
+        try:
+            market_data, economic_data, prompt_context = await self._gather_market_data(scenario)
+            
+            chunks = []
+            stream = self._stream_vllm if self.engine is not None else self._stream_generate
+            async for text in stream(prompt_context):
+                chunks.append(text)
+                yield {"type": "token", "agent": "Market", "text": text}
+            
+            result = await asyncio.to_thread(self._build_result, scenario, "".join(chunks).strip(), market_data, economic_data)
+            logger.info("📈 Streamed market analysis completed with real data integration")
+        except Exception as e:
+            logger.error(f"❌ Market analysis stream failed: {e}")
+            result = self._error_result(e)
+        
+        yield {"type": "result", "agent": "Market", "result": result}
+    
+    def _result_key(self, scenario: str) -> str:
+        """Result cache key for a scenario, ignoring case and surrounding whitespace"""
+        return blake2b(scenario.strip().lower().encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _cached_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """Copy of a fresh cached result, or None on a miss"""
+        entry = self.result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > MARKET_RESULT_CACHE_TTL:
+            del self.result_cache[key]
+            return None
+        self.result_cache.move_to_end(key)
+        # Callers may annotate the result, so never hand out the cached dict itself
+        return copy.deepcopy(result)
+    
+    def _store_result(self, key: str, result: Dict[str, Any]):
+        """Insert a fresh result and evict least recently used entries"""
+        self.result_cache[key] = (time.monotonic(), copy.deepcopy(result))
+        self.result_cache.move_to_end(key)
+        while len(self.result_cache) > MARKET_RESULT_CACHE_SIZE:
+            self.result_cache.popitem(last=False)
+    
+    async def _gather_market_data(self, scenario: str) -> Tuple[List[Dict], List[Dict], str]:
+        """Fetch market news and economic indicators and build the scenario-specific prompt context"""
+        logger.info("📈 Starting comprehensive market analysis with real data...")
+        
+        # 1-2. Get real market news and trends alongside the economic and market datasets
+        market_data, economic_data = await asyncio.gather(
+            self.market_news.get_market_news(
+                query=f"market analysis {scenario}",
+                limit=15
+            ),
+            self.dataset_loader.get_economic_indicators()
+        )
+        logger.info(f"📰 Retrieved {len(market_data)} real market news articles")
+        logger.info(f"📊 Retrieved {len(economic_data)} economic indicators")
+        
+        # 3. Create comprehensive market analysis prompt with real data
+        market_context = self._build_market_context(market_data, economic_data)
+        
+        # Scenario-specific middle of the prompt - PROMPT_HEAD and PROMPT_INSTRUCTIONS wrap it
+        prompt_context = f"{self._trim_scenario(scenario)}\n\nReal Market Data Context:\n{market_context}\n\n"
+        return market_data, economic_data, prompt_context
+    
+    def _build_result(self, scenario: str, analysis: str, market_data: List[Dict],
+                      economic_data: List[Dict]) -> Dict[str, Any]:
+        """Structure the generated analysis and the real market data into the agent result"""
+        # Count every analysis indicator in one pass over the lowercased text
+        indicator_counts = self._scan_indicators(analysis.lower())
+        
+        # Lowercase the scenario once, and scan each article's content once into a mention matrix
+        scenario_lower = scenario.lower()
+        news_mentions = self._scan_news([news.get('content', '').lower() for news in market_data])
+        
+        # 4. Enhance analysis with real data insights
+        market_insights = self._extract_market_insights(news_mentions, economic_data)
+        
+        # Structure the comprehensive response
+        return {
+            "agent": "Market", 
+            "model": self.model_name,
+            "analysis": analysis,
+            "real_market_data": {
+                "market_news_count": len(market_data),
+                "economic_indicators": len(economic_data),
+                "data_freshness": "Real-time market data"
+            },
+            "market_metrics": {
+                "market_size_potential": self._assess_market_size_with_data(indicator_counts, economic_data),
+                "competitive_intensity": self._assess_competition_with_data(indicator_counts, news_mentions),
+                "growth_opportunity": self._assess_growth_potential_with_data(indicator_counts, economic_data),
+                "market_entry_difficulty": self._assess_entry_barriers_with_data(indicator_counts, news_mentions),
+                "customer_demand": self._assess_demand_with_data(indicator_counts, news_mentions)
+            },
+            "competitive_analysis": self._analyze_competition_with_data(scenario_lower, analysis, indicator_counts, news_mentions),
+            "market_segments": self._identify_target_segments_with_data(indicator_counts, news_mentions),
+            "growth_drivers": self._identify_growth_drivers_with_data(indicator_counts, economic_data),
+            "market_challenges": self._identify_challenges_with_data(indicator_counts, news_mentions),
+            "strategic_recommendations": self._generate_data_driven_recommendations(analysis, news_mentions, economic_data),
+            "economic_indicators_impact": market_insights["economic_impact"],
+            "market_trends": market_insights["trends"],
+            "overall_market_score": self._calculate_market_attractiveness_with_data(indicator_counts, news_mentions, economic_data),
+            "confidence": self._calculate_confidence(analysis, indicator_counts, scenario_lower, market_data, economic_data),
+            "device": self.device
+        }
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Result returned when the market analysis fails"""
+        return {
+            "agent": "Market",
+            "error": str(error),
+            "analysis": "Market analysis unavailable due to technical error"
+        }
+    
+    def _load_vllm_engine(self):
+        """Start a vLLM engine on the AWQ TinyLlama checkpoint"""
+        return AsyncLLMEngine.from_engine_args(AsyncEngineArgs(
+            model=tinyllama.TINYLLAMA_AWQ_MODEL,
+            quantization="awq",
+            dtype="float16",
+            gpu_memory_utilization=MARKET_VLLM_GPU_MEMORY,
+            max_model_len=1024
+        ))
+    
+    def _load_draft_model(self):
+        """Load the speculative-decoding draft model on the agent's device"""
+        # Small draft proposes several tokens that TinyLlama verifies in one forward pass
+        return AutoModelForCausalLM.from_pretrained(
+            MARKET_DRAFT_MODEL,
+            torch_dtype=self.compute_dtype if self.device == "cuda" else torch.float32,
+            low_cpu_mem_usage=True
+        ).to(self.device).eval()
+    
+    async def _submit(self, prompt: str) -> str:
+        """Queue a prompt context for the batch worker and wait for its generated text"""
+        future = asyncio.get_running_loop().create_future()
+        await self.request_queue.put((prompt, future))
+        return await future
+    
+    async def _batch_worker(self):
+        """Drain queued prompts into batches of up to MARKET_BATCH_SIZE and generate each batch at once"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self.request_queue.get()]
+            deadline = loop.time() + MARKET_BATCH_WINDOW
+            while len(batch) < MARKET_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.request_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Skip callers that gave up while waiting
+            batch = [(prompt, future) for prompt, future in batch if not future.done()]
+            if not batch:
+                continue
+            
+            try:
+                async with self.generate_lock:
+                    texts = await self._generate_batch([prompt for prompt, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result(text)
+    
+    async def _generate_batch(self, prompts: List[str]) -> List[str]:
+        """Generate analyses for a batch of prompt contexts in one model.generate call"""
+        if len(prompts) > 1:
+            logger.info(f"📦 Generating {len(prompts)} market analyses in one batch")
+        
+        inputs = self._encode_prompts(prompts, fill=self.static_kv is not None)
+        kwargs = self._generation_kwargs(len(prompts))
+        if self.static_kv is not None:
+            # One cache of one shape for every batch, so the compiled decode graph is always reused;
+            # generate_in_thread empties it before each call
+            kwargs["past_key_values"] = self.static_kv
+        
+        # Generate on a worker thread so the event loop keeps serving requests
+        outputs = await generate_in_thread(self.model, **inputs, **kwargs)
+        
+        # Every row shares the padded prompt width, so the new tokens start at the same column;
+        # rows past the real prompts only fill the static batch
+        prompt_length = inputs["input_ids"].shape[1]
+        texts = self.tokenizer.batch_decode(outputs[:len(prompts), prompt_length:], skip_special_tokens=True)
+        return [text.strip() for text in texts]
     
-    def _assess_market_size(self, text: str) -> str:
-        """Assess market size potential"""
-        text_lower = text.lower()
-        large_indicators = ["large market", "billion", "massive", "huge", "enormous", "significant market"]
-        medium_indicators = ["medium market", "million", "moderate", "substantial", "growing market"]
-        small_indicators = ["small market", "niche", "limited", "narrow", "specialized"]
-        
-        large_count = sum(1 for indicator in large_indicators if indicator in text_lower)
-        medium_count = sum(1 for indicator in medium_indicators if indicator in text_lower)
-        small_count = sum(1 for indicator in small_indicators if indicator in text_lower)
-        
-        if large_count > medium_count and large_count > small_count:
-            return "LARGE"
-        elif medium_count > small_count:
-            return "MEDIUM"
+    async def _stream_generate(self, prompt: str) -> AsyncIterator[str]:
+        """Generate the analysis for one prompt context, yielding text as it is decoded"""
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        
+        async with self.generate_lock:
+            inputs = self._encode_prompts([prompt])
+            generation = asyncio.create_task(
+                generate_in_thread(self.model, **inputs, **self._generation_kwargs(1), streamer=streamer)
+            )
+            # generate does not end the stream when it raises, so end it here to release the reader
+            generation.add_done_callback(
+                lambda task: streamer.end() if not task.cancelled() and task.exception() else None
+            )
+            
+            try:
+                # The streamer is a blocking queue - wait for each chunk on a worker thread
+                while (text := await asyncio.to_thread(next, streamer, None)) is not None:
+                    if text:
+                        yield text
+            finally:
+                # Keep the lock until generate returns, even if the consumer stopped reading early
+                await asyncio.wait([generation])
+            generation.result()  # Re-raise a generate failure
+    
+    async def _stream_vllm(self, prompt: str) -> AsyncIterator[str]:
+        """Generate the analysis for one prompt context on the vLLM engine, yielding text as it is decoded"""
+        sampling = SamplingParams(temperature=0.0, max_tokens=MARKET_MAX_NEW_TOKENS)  # Greedy
+        sent = 0
+        async for output in self.engine.generate(
+            {"prompt_token_ids": self._prompt_ids([prompt])[0]}, sampling, request_id=uuid.uuid4().hex
+        ):
+            # Outputs carry the cumulative text, so yield only what is new
+            text = output.outputs[0].text
+            if len(text) > sent:
+                yield text[sent:]
+                sent = len(text)
+    
+    def _trim_scenario(self, scenario: str) -> str:
+        """Cut the scenario to MAX_SCENARIO_TOKENS tokens, leaving shorter ones untouched"""
+        ids = self.tokenizer(scenario, add_special_tokens=False)["input_ids"]
+        if len(ids) <= self.MAX_SCENARIO_TOKENS:
+            return scenario
+        logger.warning(f"⚠️ Scenario is {len(ids)} tokens, truncating to {self.MAX_SCENARIO_TOKENS} for the prompt")
+        return self.tokenizer.decode(ids[:self.MAX_SCENARIO_TOKENS])
+    
+    def _prompt_ids(self, prompts: List[str]) -> List[List[int]]:
+        """Token ids of full prompts: the pretokenized static pieces around each tokenized context"""
+        # Only the scenario-specific contexts are tokenized per request; they are truncated
+        # so the pretokenized head and instructions always fit in MAX_PROMPT_TOKENS
+        budget = self.MAX_PROMPT_TOKENS - len(self.head_ids) - len(self.instruction_ids)
+        context_ids = self.tokenizer(prompts, add_special_tokens=False, max_length=budget, truncation=True)["input_ids"]
+        return [self.head_ids + ids + self.instruction_ids for ids in context_ids]
+    
+    def _encode_prompts(self, prompts: List[str], fill: bool = False) -> Dict[str, torch.Tensor]:
+        """
+        Tokenize prompt contexts into a left-padded batch around the pretokenized static pieces
+        
+        With fill, the batch takes the static cache's full shape: MAX_PROMPT_TOKENS wide and
+        MARKET_BATCH_SIZE rows, the real prompts repeated into the spare rows.
+        """
+        # Left-padded batch with an attention mask masking the padding
+        if fill:
+            padding = {"padding": "max_length", "max_length": self.MAX_PROMPT_TOKENS}
         else:
-            return "SMALL"
+            padding = {"padding": True, "pad_to_multiple_of": MARKET_PROMPT_PAD_MULTIPLE}
+        inputs = self.tokenizer.pad({"input_ids": self._prompt_ids(prompts)}, return_tensors="pt", **padding)
+        if fill:
+            rows = torch.arange(MARKET_BATCH_SIZE) % len(prompts)
+            inputs = {name: tensor[rows] for name, tensor in inputs.items()}
+        if self.device != "cuda":
+            return dict(inputs)
+        # Pinned host buffers let the copies run asynchronously; they are queued on the same
+        # stream as generate's kernels, so those still see the finished ids and mask
+        return {name: tensor.pin_memory().to(self.device, non_blocking=True) for name, tensor in inputs.items()}
+    
+    def _generation_kwargs(self, batch_size: int) -> Dict[str, Any]:
+        """model.generate arguments for a batch of the given size"""
+        kwargs = {
+            "max_new_tokens": MARKET_MAX_NEW_TOKENS,
+            "do_sample": False,  # Greedy - the analysis is keyword-scored, so sampling buys nothing
+            "num_beams": 1,
+            "use_cache": True,  # Reuse past keys/values instead of re-attending the whole sequence each step
+            "pad_token_id": self.tokenizer.eos_token_id
+        }
+        # Assisted generation only supports a single sequence, so batches decode normally
+        if self.assistant is not None and batch_size == 1:
+            kwargs.update(assistant_model=self.assistant, num_assistant_tokens=MARKET_DRAFT_TOKENS)
+        return kwargs
     
-    def _assess_competition(self, text: str) -> str:
-        """Assess competitive intensity"""
-        text_lower = text.lower()
-        high_competition = ["intense competition", "highly competitive", "saturated", "many competitors"]
-        medium_competition = ["moderate competition", "some competitors", "competitive landscape"]
-        low_competition = ["low competition", "few competitors", "emerging market", "blue ocean"]
+    async def _compile_decode(self):
+        """Generate with a static KV cache and a CUDA-graph compiled forward, paying the compile cost with a warmup"""
+        # Layers offloaded to CPU run through accelerate hooks, which cannot be captured in a CUDA graph
+        offloaded = set(getattr(self.model, "hf_device_map", {}).values()) - {0, "cuda", "cuda:0"}
+        if offloaded:
+            logger.info("📈 Market Agent has CPU-offloaded layers - keeping the dynamic KV cache")
+            return
         
-        high_count = sum(1 for indicator in high_competition if indicator in text_lower)
-        medium_count = sum(1 for indicator in medium_competition if indicator in text_lower)
-        low_count = sum(1 for indicator in low_competition if indicator in text_lower)
+        try:
+            # Fixed-size cache owned by this agent (agents sharing the weights keep their own caches),
+            # so every batch has the same shapes and replays one graph; generate compiles the decode
+            # step into CUDA graphs for compileable caches
+            self.static_kv = StaticCache(
+                config=self.model.config,
+                max_batch_size=MARKET_BATCH_SIZE,
+                max_cache_len=self.MAX_PROMPT_TOKENS + MARKET_MAX_NEW_TOKENS
+            )
+            async with self.generate_lock:
+                await self._generate_batch(["Market Assessment:"])
+            logger.info("⚡ Market Agent decode compiled with a static KV cache")
+        except Exception as e:
+            self.static_kv = None
+            logger.warning(f"⚠️ Static-cache compile unavailable for Market Agent ({e}) - decoding eagerly")
+    
+    def _scan_indicators(self, text_lower: str) -> Counter:
+        """Count occurrences of every analysis indicator in one pass over lowercased text"""
+        counts = Counter()
+        for match in _ANALYSIS_TERM_RE.finditer(text_lower):
+            counts.update(_TERM_PREFIXES[match.group(1)])
+        return counts
+    
+    def _scan_news(self, news_contents: List[str]) -> np.ndarray:
+        """Mark which news keyword categories each lowercased article mentions, one pass per article"""
+        mentions = np.zeros((len(news_contents), len(_NEWS_COLUMNS)), dtype=bool)
+        for row, content in enumerate(news_contents):
+            for match in _NEWS_TERM_RE.finditer(content):
+                for term in _NEWS_TERM_PREFIXES[match.group(1)]:
+                    mentions[row, _NEWS_TERM_COLUMNS[term]] = True
+        return mentions
+    
+    def _news_count(self, mentions: np.ndarray, *categories: str) -> int:
+        """Number of articles mentioning all of the given categories"""
+        return int(mentions[:, [_NEWS_COLUMNS[category] for category in categories]].all(axis=1).sum())
+    
+    def _present(self, counts: Counter, category: str) -> int:
+        """Number of distinct indicators of a category present in the analysis"""
+        return sum(1 for term in _ANALYSIS_INDICATORS[category] if counts[term])
+    
+    def _occurrences(self, counts: Counter, category: str) -> int:
+        """Total occurrences of a category's indicators in the analysis"""
+        return sum(counts[term] for term in _ANALYSIS_INDICATORS[category])
+    
+    def _bucket(self, counts: Counter, table: str) -> str:
+        """Dominant level of a three-level assessment from its indicator counts"""
+        (high, high_level), (medium, medium_level), (low, low_level) = _LEVEL_TABLES[table]
+        high_count = self._present(counts, high)
+        medium_count = self._present(counts, medium)
+        low_count = self._present(counts, low)
         
         if high_count > medium_count and high_count > low_count:
-            return "HIGH"
+            return high_level
         elif medium_count > low_count:
-            return "MEDIUM"
+            return medium_level
         else:
-            return "LOW"
+            return low_level
+    
+    def _labels(self, counts: Counter, table: str) -> List[str]:
+        """Labels of a findings table whose indicators appear in the analysis"""
+        return [label for category, label in _LABEL_TABLES[table] if self._present(counts, category)]
     
-    def _assess_growth_potential(self, text: str) -> float:
+    def _assess_growth_potential(self, counts: Counter) -> float:
         """Assess growth potential score"""
-        growth_indicators = ["growth", "expanding", "increasing", "rising", "growing", "opportunity"]
-        decline_indicators = ["declining", "shrinking", "decreasing", "falling", "stagnant"]
-        
-        growth_count = sum(text.lower().count(indicator) for indicator in growth_indicators)
-        decline_count = sum(text.lower().count(indicator) for indicator in decline_indicators)
+        growth_count = self._occurrences(counts, "growth")
+        decline_count = self._occurrences(counts, "decline")
         
         if growth_count + decline_count == 0:
             return 0.5
@@ -244,31 +694,10 @@ class MarketAgent:
         growth_ratio = growth_count / (growth_count + decline_count)
         return round(growth_ratio, 2)
     
-    def _assess_entry_barriers(self, text: str) -> str:
-        """Assess market entry barriers"""
-        text_lower = text.lower()
-        high_barriers = ["high barriers", "difficult entry", "complex", "regulated", "capital intensive"]
-        medium_barriers = ["moderate barriers", "some challenges", "established players"]
-        low_barriers = ["low barriers", "easy entry", "open market", "accessible"]
-        
-        high_count = sum(1 for indicator in high_barriers if indicator in text_lower)
-        medium_count = sum(1 for indicator in medium_barriers if indicator in text_lower)
-        low_count = sum(1 for indicator in low_barriers if indicator in text_lower)
-        
-        if high_count > medium_count and high_count > low_count:
-            return "HIGH"
-        elif medium_count > low_count:
-            return "MEDIUM"
-        else:
-            return "LOW"
-    
-    def _assess_demand(self, text: str) -> float:
+    def _assess_demand(self, counts: Counter) -> float:
         """Assess customer demand level"""
-        demand_indicators = ["high demand", "strong demand", "increasing demand", "growing interest"]
-        weak_demand_indicators = ["low demand", "weak demand", "declining interest", "limited demand"]
-        
-        strong_demand = sum(1 for indicator in demand_indicators if indicator in text.lower())
-        weak_demand = sum(1 for indicator in weak_demand_indicators if indicator in text.lower())
+        strong_demand = self._present(counts, "demand_strong")
+        weak_demand = self._present(counts, "demand_weak")
         
         if strong_demand + weak_demand == 0:
             return 0.5
@@ -276,21 +705,20 @@ class MarketAgent:
         demand_ratio = strong_demand / (strong_demand + weak_demand)
         return round(demand_ratio, 2)
     
-    def _analyze_competition(self, scenario: str, analysis: str) -> Dict[str, Any]:
+    def _analyze_competition(self, scenario_lower: str, analysis: str, counts: Counter) -> Dict[str, Any]:
         """Analyze competitive landscape"""
         return {
-            "competitive_intensity": self._assess_competition(analysis),
-            "key_competitors": self._extract_competitors(scenario, analysis),
+            "competitive_intensity": self._bucket(counts, "competition"),
+            "key_competitors": self._extract_competitors(scenario_lower, analysis),
             "competitive_advantages": self._identify_advantages(analysis),
             "competitive_threats": self._identify_threats(analysis),
             "differentiation_opportunities": self._identify_differentiation(analysis)
         }
     
-    def _extract_competitors(self, scenario: str, analysis: str) -> List[str]:
-        """Extract potential competitors from analysis"""
+    def _extract_competitors(self, scenario_lower: str, analysis: str) -> List[str]:
+        """Extract potential competitors from the lowercased scenario"""
         # Simple competitor identification based on common business terms
         competitors = []
-        scenario_lower = scenario.lower()
         
         if "fintech" in scenario_lower:
             competitors.extend(["Traditional Banks", "Payment Processors", "Digital Wallets"])
@@ -303,42 +731,22 @@ class MarketAgent:
         
         return competitors[:3] if competitors else ["Established Players", "New Entrants", "Substitute Products"]
     
-    def _identify_target_segments(self, analysis: str) -> List[str]:
+    def _identify_target_segments(self, counts: Counter) -> List[str]:
         """Identify target market segments"""
-        segments = []
-        analysis_lower = analysis.lower()
-        
-        if any(term in analysis_lower for term in ["young", "millennial", "gen z"]):
-            segments.append("Young Adults/Digital Natives")
-        if any(term in analysis_lower for term in ["business", "enterprise", "b2b"]):
-            segments.append("Business/Enterprise")
-        if any(term in analysis_lower for term in ["consumer", "individual", "personal"]):
-            segments.append("Individual Consumers")
-        if any(term in analysis_lower for term in ["small business", "sme", "startup"]):
-            segments.append("Small and Medium Enterprises")
-        
+        segments = self._labels(counts, "segments")
         return segments if segments else ["General Market", "Early Adopters", "Mainstream Users"]
     
-    def _identify_target_segments_with_data(self, analysis: str, market_data: List[Dict]) -> List[str]:
+    def _identify_target_segments_with_data(self, counts: Counter, news_mentions: np.ndarray) -> List[str]:
         """Identify target market segments using real market data"""
         # Start with base analysis
-        base_segments = self._identify_target_segments(analysis)
+        base_segments = self._identify_target_segments(counts)
         
         # Enhance with market data insights
-        if market_data:
+        if len(news_mentions):
             # Analyze market data for segment indicators
-            segment_keywords = {
-                "Enterprise/B2B": ["enterprise", "business", "corporate", "b2b"],
-                "Small Business": ["small business", "sme", "startup", "entrepreneur"],
-                "Consumer/B2C": ["consumer", "individual", "personal", "b2c"],
-                "Tech-Savvy Users": ["digital", "tech", "app", "platform"],
-                "Traditional Markets": ["traditional", "conventional", "established"]
-            }
-            
             enhanced_segments = []
-            for segment, keywords in segment_keywords.items():
-                mentions = sum(1 for news in market_data 
-                             if any(keyword in news.get('content', '').lower() for keyword in keywords))
+            for segment in _NEWS_SEGMENTS:
+                mentions = self._news_count(news_mentions, segment)
                 if mentions > 1:  # Threshold for relevance
                     enhanced_segments.append(f"{segment} (Market Activity: {mentions} mentions)")
             
@@ -348,36 +756,14 @@ class MarketAgent:
         
         return base_segments
     
-    def _identify_growth_drivers(self, analysis: str) -> List[str]:
+    def _identify_growth_drivers(self, counts: Counter) -> List[str]:
         """Identify key growth drivers"""
-        drivers = []
-        analysis_lower = analysis.lower()
-        
-        if any(term in analysis_lower for term in ["technology", "digital", "innovation"]):
-            drivers.append("Technological Innovation")
-        if any(term in analysis_lower for term in ["demand", "need", "requirement"]):
-            drivers.append("Market Demand")
-        if any(term in analysis_lower for term in ["regulation", "policy", "government"]):
-            drivers.append("Regulatory Changes")
-        if any(term in analysis_lower for term in ["economic", "growth", "expansion"]):
-            drivers.append("Economic Growth")
-        
+        drivers = self._labels(counts, "growth_drivers")
         return drivers[:3] if drivers else ["Market Expansion", "Customer Adoption", "Product Innovation"]
     
-    def _identify_challenges(self, analysis: str) -> List[str]:
+    def _identify_challenges(self, counts: Counter) -> List[str]:
         """Identify market challenges"""
-        challenges = []
-        analysis_lower = analysis.lower()
-        
-        if any(term in analysis_lower for term in ["competition", "competitive"]):
-            challenges.append("Intense Competition")
-        if any(term in analysis_lower for term in ["regulation", "compliance"]):
-            challenges.append("Regulatory Complexity")
-        if any(term in analysis_lower for term in ["cost", "expensive", "pricing"]):
-            challenges.append("Cost Pressures")
-        if any(term in analysis_lower for term in ["technology", "technical"]):
-            challenges.append("Technical Challenges")
-        
+        challenges = self._labels(counts, "challenges")
         return challenges[:3] if challenges else ["Market Entry", "Customer Acquisition", "Scalability"]
     
     def _identify_advantages(self, analysis: str) -> List[str]:
@@ -403,14 +789,11 @@ class MarketAgent:
         ]
         return recommendations
     
-    def _calculate_market_attractiveness(self, analysis: str) -> float:
+    def _calculate_market_attractiveness(self, counts: Counter) -> float:
         """Calculate overall market attractiveness score"""
         # Simple scoring based on positive vs negative indicators
-        positive_indicators = ["opportunity", "growth", "potential", "attractive", "promising"]
-        negative_indicators = ["challenge", "difficult", "risk", "threat", "barrier"]
-        
-        positive_count = sum(analysis.lower().count(indicator) for indicator in positive_indicators)
-        negative_count = sum(analysis.lower().count(indicator) for indicator in negative_indicators)
+        positive_count = self._occurrences(counts, "attractive")
+        negative_count = self._occurrences(counts, "unattractive")
         
         if positive_count + negative_count == 0:
             return 0.5
@@ -420,30 +803,27 @@ class MarketAgent:
     
     def _build_market_context(self, market_data: List[Dict], economic_data: List[Dict]) -> str:
         """Build market context from real data"""
-        context_parts = []
+        sections = []
         
-        # Add market news insights
+        # Add market news insights - top 5 news items
         if market_data:
-            context_parts.append("RECENT MARKET NEWS:")
-            for news in market_data[:5]:  # Top 5 news items
-                context_parts.append(f"• {news.get('headline', 'N/A')}")
-                if news.get('summary'):
-                    context_parts.append(f"  Summary: {news.get('summary', '')[:100]}...")
-            context_parts.append("")
-        
-        # Add economic indicators
+            news_lines = [
+                f"• {news.get('headline', 'N/A')}" + (f"\n  Summary: {summary[:100]}..." if (summary := news.get('summary')) else "")
+                for news in market_data[:5]
+            ]
+            sections.append("RECENT MARKET NEWS:\n" + "\n".join(news_lines))
+        
+        # Add economic indicators - top 5 indicators
         if economic_data:
-            context_parts.append("ECONOMIC INDICATORS:")
-            for indicator in economic_data[:5]:  # Top 5 indicators
-                name = indicator.get('indicator_name', 'Unknown')
-                value = indicator.get('current_value', 'N/A')
-                trend = indicator.get('trend', 'stable')
-                context_parts.append(f"• {name}: {value} (Trend: {trend})")
-            context_parts.append("")
+            indicator_lines = [
+                f"• {indicator.get('indicator_name', 'Unknown')}: {indicator.get('current_value', 'N/A')} (Trend: {indicator.get('trend', 'stable')})"
+                for indicator in economic_data[:5]
+            ]
+            sections.append("ECONOMIC INDICATORS:\n" + "\n".join(indicator_lines))
         
-        return "\n".join(context_parts)
+        return "\n\n".join(sections)
     
-    def _extract_market_insights(self, market_data: List[Dict], economic_data: List[Dict]) -> Dict[str, Any]:
+    def _extract_market_insights(self, news_mentions: np.ndarray, economic_data: List[Dict]) -> Dict[str, Any]:
         """Extract insights from real market data"""
         insights = {
             "economic_impact": {},
@@ -462,14 +842,9 @@ class MarketAgent:
             }
         
         # Extract market trends from news
-        if market_data:
-            trend_keywords = ["growth", "expansion", "increase", "rise", "boost", "surge"]
-            decline_keywords = ["decline", "decrease", "fall", "drop", "slump", "crash"]
-            
-            growth_mentions = sum(1 for news in market_data 
-                                 if any(keyword in news.get('content', '').lower() for keyword in trend_keywords))
-            decline_mentions = sum(1 for news in market_data 
-                                  if any(keyword in news.get('content', '').lower() for keyword in decline_keywords))
+        if len(news_mentions):
+            growth_mentions = self._news_count(news_mentions, "trend_growth")
+            decline_mentions = self._news_count(news_mentions, "trend_decline")
             
             insights["trends"] = {
                 "growth_sentiment": growth_mentions,
@@ -479,10 +854,10 @@ class MarketAgent:
         
         return insights
     
-    def _assess_market_size_with_data(self, analysis: str, economic_data: List[Dict]) -> str:
+    def _assess_market_size_with_data(self, counts: Counter, economic_data: List[Dict]) -> str:
         """Assess market size using real economic data"""
         # Base assessment from text analysis
-        base_assessment = self._assess_market_size(analysis)
+        base_assessment = self._bucket(counts, "market_size")
         
         # Enhance with economic data
         if economic_data:
@@ -496,15 +871,13 @@ class MarketAgent:
         
         return base_assessment
     
-    def _assess_competition_with_data(self, analysis: str, market_data: List[Dict]) -> str:
+    def _assess_competition_with_data(self, counts: Counter, news_mentions: np.ndarray) -> str:
         """Assess competition using real market news"""
-        base_assessment = self._assess_competition(analysis)
+        base_assessment = self._bucket(counts, "competition")
         
         # Check for competition mentions in news
-        if market_data:
-            competition_keywords = ["competition", "competitor", "rival", "market share", "competitive"]
-            competition_mentions = sum(1 for news in market_data 
-                                     if any(keyword in news.get('content', '').lower() for keyword in competition_keywords))
+        if len(news_mentions):
+            competition_mentions = self._news_count(news_mentions, "competition")
             
             if competition_mentions > 3:
                 return "Very High (Active competitive environment)"
@@ -513,9 +886,9 @@ class MarketAgent:
         
         return base_assessment
     
-    def _assess_growth_potential_with_data(self, analysis: str, economic_data: List[Dict]) -> str:
+    def _assess_growth_potential_with_data(self, counts: Counter, economic_data: List[Dict]) -> str:
         """Assess growth potential using economic indicators"""
-        base_assessment = self._assess_growth_potential(analysis)
+        base_assessment = self._assess_growth_potential(counts)
         
         if economic_data:
             growth_indicators = [i for i in economic_data if i.get('trend') == 'positive']
@@ -526,58 +899,47 @@ class MarketAgent:
         
         return base_assessment
     
-    def _assess_entry_barriers_with_data(self, analysis: str, market_data: List[Dict]) -> str:
+    def _assess_entry_barriers_with_data(self, counts: Counter, news_mentions: np.ndarray) -> str:
         """Assess entry barriers using market news"""
-        base_assessment = self._assess_entry_barriers(analysis)
+        base_assessment = self._bucket(counts, "entry_barriers")
         
-        if market_data:
-            barrier_keywords = ["regulation", "compliance", "barrier", "restriction", "requirement"]
-            barrier_mentions = sum(1 for news in market_data 
-                                 if any(keyword in news.get('content', '').lower() for keyword in barrier_keywords))
+        if len(news_mentions):
+            barrier_mentions = self._news_count(news_mentions, "barriers")
             
             if barrier_mentions > 2:
                 return "Very High (Regulatory and market barriers)"
         
         return base_assessment
     
-    def _assess_demand_with_data(self, analysis: str, market_data: List[Dict]) -> str:
+    def _assess_demand_with_data(self, counts: Counter, news_mentions: np.ndarray) -> str:
         """Assess demand using market news sentiment"""
-        base_assessment = self._assess_demand(analysis)
+        base_assessment = self._assess_demand(counts)
         
-        if market_data:
-            demand_keywords = ["demand", "sales", "revenue", "customer", "consumer"]
-            positive_keywords = ["increase", "growth", "strong", "high", "rising"]
-            
-            demand_mentions = sum(1 for news in market_data 
-                                if any(keyword in news.get('content', '').lower() for keyword in demand_keywords))
-            positive_mentions = sum(1 for news in market_data 
-                                  if any(keyword in news.get('content', '').lower() for keyword in positive_keywords))
+        if len(news_mentions):
+            demand_mentions = self._news_count(news_mentions, "demand")
+            positive_mentions = self._news_count(news_mentions, "demand_positive")
             
             if demand_mentions > 0 and positive_mentions / max(demand_mentions, 1) > 0.5:
                 return "High (Positive demand signals in market)"
         
         return base_assessment
     
-    def _analyze_competition_with_data(self, scenario: str, analysis: str, market_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_competition_with_data(self, scenario_lower: str, analysis: str, counts: Counter,
+                                       news_mentions: np.ndarray) -> Dict[str, Any]:
         """Enhanced competitive analysis with real market data"""
-        base_analysis = self._analyze_competition(scenario, analysis)
+        base_analysis = self._analyze_competition(scenario_lower, analysis, counts)
         
         # Add real market insights
         competitive_insights = {
-            "market_activity": len([news for news in market_data 
-                                  if "competition" in news.get('content', '').lower()]),
-            "merger_activity": len([news for news in market_data 
-                                  if any(term in news.get('content', '').lower() 
-                                        for term in ["merger", "acquisition", "takeover"])]),
-            "new_entrants": len([news for news in market_data 
-                               if "new" in news.get('content', '').lower() and 
-                                  "company" in news.get('content', '').lower()])
+            "market_activity": self._news_count(news_mentions, "competition_term"),
+            "merger_activity": self._news_count(news_mentions, "merger"),
+            "new_entrants": self._news_count(news_mentions, "entrant_new", "entrant_company")
         }
         
         base_analysis.update(competitive_insights)
         return base_analysis
     
-    def _generate_data_driven_recommendations(self, analysis: str, market_data: List[Dict], 
+    def _generate_data_driven_recommendations(self, analysis: str, news_mentions: np.ndarray, 
                                             economic_data: List[Dict]) -> List[str]:
         """Generate recommendations based on real market data"""
         recommendations = self._generate_market_recommendations(analysis)
@@ -592,17 +954,14 @@ class MarketAgent:
             if len(negative_trends) > 2:
                 recommendations.append("Implement defensive strategies due to economic headwinds")
         
-        if market_data:
-            growth_news = [news for news in market_data 
-                          if "growth" in news.get('content', '').lower()]
-            if len(growth_news) > 3:
-                recommendations.append("Leverage current market growth trends for strategic advantage")
+        if self._news_count(news_mentions, "growth_term") > 3:
+            recommendations.append("Leverage current market growth trends for strategic advantage")
         
         return recommendations
     
-    def _identify_growth_drivers_with_data(self, analysis: str, economic_data: List[Dict]) -> List[str]:
+    def _identify_growth_drivers_with_data(self, counts: Counter, economic_data: List[Dict]) -> List[str]:
         """Identify growth drivers using real economic data"""
-        growth_drivers = self._identify_growth_drivers(analysis)
+        growth_drivers = self._identify_growth_drivers(counts)
         
         # Add data-driven growth drivers
         if economic_data:
@@ -622,42 +981,36 @@ class MarketAgent:
         
         return growth_drivers
     
-    def _identify_challenges_with_data(self, analysis: str, market_data: List[Dict]) -> List[str]:
+    def _identify_challenges_with_data(self, counts: Counter, news_mentions: np.ndarray) -> List[str]:
         """Identify market challenges using real market data"""
-        challenges = self._identify_challenges(analysis)
+        challenges = self._identify_challenges(counts)
         
         # Add data-driven challenges
-        if market_data:
+        if len(news_mentions):
             # Check for negative sentiment in market news
-            negative_keywords = ["challenge", "difficulty", "problem", "risk", "decline", "threat"]
-            negative_mentions = sum(1 for news in market_data 
-                                  if any(keyword in news.get('content', '').lower() for keyword in negative_keywords))
+            negative_mentions = self._news_count(news_mentions, "challenge_negative")
             
             if negative_mentions > 2:
                 challenges.append("Market sentiment indicates increased competitive challenges")
             
             # Check for high competition mentions
-            competition_keywords = ["competition", "competitor", "rival", "market share"]
-            competition_mentions = sum(1 for news in market_data 
-                                     if any(keyword in news.get('content', '').lower() for keyword in competition_keywords))
+            competition_mentions = self._news_count(news_mentions, "challenge_competition")
             
             if competition_mentions > 1:
                 challenges.append("Intense competitive environment detected in market data")
             
             # Check for regulatory or barrier mentions
-            barrier_keywords = ["regulation", "barrier", "restriction", "requirement"]
-            barrier_mentions = sum(1 for news in market_data 
-                                 if any(keyword in news.get('content', '').lower() for keyword in barrier_keywords))
+            barrier_mentions = self._news_count(news_mentions, "challenge_barriers")
             
             if barrier_mentions > 0:
                 challenges.append("Regulatory or market barriers identified in current news")
         
         return challenges
     
-    def _calculate_market_attractiveness_with_data(self, analysis: str, market_data: List[Dict], 
+    def _calculate_market_attractiveness_with_data(self, counts: Counter, news_mentions: np.ndarray, 
                                                  economic_data: List[Dict]) -> float:
         """Calculate market attractiveness with real data insights"""
-        base_score = self._calculate_market_attractiveness(analysis)
+        base_score = self._calculate_market_attractiveness(counts)
         
         # Adjust based on real data
         data_adjustment = 0.0
@@ -669,11 +1022,9 @@ class MarketAgent:
                 economic_sentiment = positive_indicators / total_indicators
                 data_adjustment += (economic_sentiment - 0.5) * 0.2
         
-        if market_data:
-            positive_news = len([news for news in market_data 
-                               if any(word in news.get('content', '').lower() 
-                                     for word in ["growth", "opportunity", "positive", "strong"])])
-            total_news = len(market_data)
+        if len(news_mentions):
+            positive_news = self._news_count(news_mentions, "attractive")
+            total_news = len(news_mentions)
             if total_news > 0:
                 news_sentiment = positive_news / total_news
                 data_adjustment += (news_sentiment - 0.5) * 0.1
@@ -681,13 +1032,11 @@ class MarketAgent:
         final_score = base_score + data_adjustment
         return round(min(max(final_score, 0.1), 0.9), 2)
     
-    def _calculate_confidence(self, analysis: str, scenario: str, market_data: List[Dict], economic_data: List[Dict]) -> float:
+    def _calculate_confidence(self, analysis: str, counts: Counter, scenario_lower: str, 
+                              market_data: List[Dict], economic_data: List[Dict]) -> float:
         """Calculate dynamic confidence score based on market analysis quality and data availability"""
         confidence = 0.5  # Base confidence
         
-        # Analysis quality factors
-        analysis_lower = analysis.lower()
-        
         # Length and detail indicators
         if len(analysis) > 500:
             confidence += 0.1
@@ -695,8 +1044,7 @@ class MarketAgent:
             confidence += 0.1
             
         # Market assessment quality indicators
-        market_keywords = ["market", "competition", "demand", "growth", "opportunity", "trend"]
-        market_count = sum(1 for keyword in market_keywords if keyword in analysis_lower)
+        market_count = self._present(counts, "quality_market")
         confidence += min(market_count * 0.04, 0.15)
         
         # Data availability factors
@@ -706,15 +1054,13 @@ class MarketAgent:
             confidence += 0.08
             
         # Scenario complexity factor
-        scenario_lower = scenario.lower()
-        if any(word in scenario_lower for word in ["emerging", "new market", "disruptive"]):
+        if any(word in scenario_lower for word in _EMERGING_TERMS):
             confidence -= 0.05  # Emerging markets have higher uncertainty
-        if any(word in scenario_lower for word in ["established", "mature", "traditional"]):
+        if any(word in scenario_lower for word in _ESTABLISHED_TERMS):
             confidence += 0.05  # Established markets have more data
             
         # Specific market terms that indicate thorough analysis
-        specific_terms = ["market share", "competitive advantage", "barriers to entry", "customer segmentation", "pricing strategy"]
-        specific_count = sum(1 for term in specific_terms if term in analysis_lower)
+        specific_count = self._present(counts, "quality_specific")
         confidence += min(specific_count * 0.03, 0.12)
         
         return round(min(max(confidence, 0.35), 0.95), 2)
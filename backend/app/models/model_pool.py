@@ -0,0 +1,38 @@
+"""
+🧩 Shared Model Pool
+One loaded copy of each model checkpoint per process and device, borrowed by every
+agent that runs it (Risk and Market both run TinyLlama, so its weights load once)
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+_models: Dict[Tuple[str, str], Any] = {}
+# Per-model locks so concurrent initializers never load the same checkpoint twice
+_load_locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+# Per-model locks serializing generate across the agents sharing the weights
+_generate_locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+async def get_model(model_name: str, device: str, loader: Callable[[], Any]) -> Any:
+    """
+    Return the process-wide model for a checkpoint on a device
+
+    The first caller's loader runs on a worker thread and later callers reuse that
+    model as-is, so agents sharing a checkpoint must share its loader (see tinyllama.py).
+    """
+    key = (model_name, device)
+    async with _load_locks[key]:
+        model = _models.get(key)
+        if model is None:
+            model = await asyncio.to_thread(loader)
+            _models[key] = model
+        else:
+            logger.info(f"♻️ Reusing loaded {model_name} on {device.upper()}")
+    return model
+
+def generate_lock(model_name: str, device: str) -> asyncio.Lock:
+    """Lock that every agent holds while generating with the shared model"""
+    return _generate_locks[(model_name, device)]
@@ -3,7 +3,7 @@
 RTX 4050 GPU Optimized with TinyLlama-1.1B-Chat
 """
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+from transformers import AutoTokenizer
 import logging
 from typing import Dict, Any, List
 import asyncio
@@ -14,16 +14,33 @@ from app.data.financial_db import FinancialDB
 from app.data.compliance_db import ComplianceDB
 from app.data.market_news import MarketNews
 from app.data.dataset_loader import DatasetLoader
+from app.data.shared_sources import get_shared
+from app.utils.prompt_cache import PromptPrefixCache
+from app.utils.inference import generate_in_thread
+from app.models.model_pool import generate_lock
+from app.models import tinyllama
 
 logger = logging.getLogger(__name__)
 
 class RiskAgent:
+    # Static instruction block - identical for every scenario, so it is prefilled once
+    PROMPT_PREFIX = """
+            You are a risk assessment specialist. Identify and analyze the following risk categories:
+            1. Financial risks (cash flow, funding, market volatility)
+            2. Operational risks (execution, scalability, resource constraints)
+            3. Market risks (competition, demand fluctuation, regulatory changes)
+            4. Technical risks (technology failure, security breaches, compliance)
+            5. Strategic risks (strategic misalignment, reputation, partnerships)
+            """
+
     def __init__(self):
-        self.model_name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"  # Use your pre-downloaded model
+        self.model_name = tinyllama.TINYLLAMA_MODEL  # Use your pre-downloaded model
         self.model = None
         self.tokenizer = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"  # Use GPU if available
         self.is_ready = False
+        self.prompt_cache = None
+        self.generate_lock = None  # Shared with every agent running the same weights
         
         # Data pipeline connections
         self.risk_api = None
@@ -32,18 +49,6 @@ class RiskAgent:
         self.market_news = None
         self.dataset_loader = None
         
-        # Configure 4-bit quantization for RTX 4050 (6GB VRAM) - Conservative settings
-        if self.device == "cuda":
-            self.quant_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16,
-                bnb_4bit_use_double_quant=True,
-                bnb_4bit_quant_type="nf4",
-                llm_int8_enable_fp32_cpu_offload=True  # Enable CPU offload for tight VRAM
-            )
-        else:
-            self.quant_config = None  # CPU doesn't need quantization
-        
     async def initialize(self):
         """Initialize the Risk Agent with comprehensive data pipeline connections"""
         try:
@@ -51,45 +56,28 @@ class RiskAgent:
             
             # Initialize all data pipeline connections for comprehensive risk assessment
             logger.info("🔗 Connecting Risk Agent to all data sources...")
-            self.risk_api = RiskAPI()
-            self.financial_db = FinancialDB()
-            self.compliance_db = ComplianceDB()
-            self.market_news = MarketNews()
-            self.dataset_loader = DatasetLoader()
-            
-            await self.risk_api.initialize()
-            await self.financial_db.initialize()
-            await self.compliance_db.initialize()
-            await self.market_news.initialize()
-            await self.dataset_loader.initialize()
+            self.risk_api = await get_shared(RiskAPI)
+            self.financial_db = await get_shared(FinancialDB)
+            self.compliance_db = await get_shared(ComplianceDB)
+            self.market_news = await get_shared(MarketNews)
+            self.dataset_loader = await get_shared(DatasetLoader)
             
             # Load tokenizer
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
             
-            # Load model with GPU optimization
-            if self.device == "cuda":
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_name,
-                    quantization_config=self.quant_config,
-                    device_map="auto",  # Let transformers handle allocation
-                    trust_remote_code=True,
-                    torch_dtype=torch.float16,
-                    max_memory={0: "800MB", "cpu": "4GB"}  # Very conservative + CPU fallback
-                )
-            else:
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    self.model_name,
-                    device_map={"": "cpu"},
-                    torch_dtype=torch.float32,  # Use float32 for CPU stability
-                    trust_remote_code=True,
-                    low_cpu_mem_usage=True,
-                    use_cache=True  # Enable KV cache for faster inference
-                )
+            # Borrowed from the shared pool - the Market Agent runs the same TinyLlama weights
+            self.model = await tinyllama.get_tinyllama(self.device)
+            self.generate_lock = generate_lock(tinyllama.checkpoint(self.device), self.device)
+            
+            # Prefill the static instructions once - requests only prefill their scenario tail
+            self.prompt_cache = PromptPrefixCache(self.model, self.tokenizer, self.PROMPT_PREFIX)
+            async with self.generate_lock:
+                await self.prompt_cache.warm()
             
             self.is_ready = True
-            logger.info(f"✅ Risk Agent ready on {self.device.upper()} - TinyLlama (~0.3GB {'VRAM' if self.device == 'cuda' else 'RAM'})")
+            logger.info(f"✅ Risk Agent ready on {self.device.upper()} - TinyLlama ({tinyllama.memory_note(self.device)})")
             
         except Exception as e:
             logger.error(f"❌ Risk Agent initialization failed: {e}")
@@ -120,8 +108,8 @@ class RiskAgent:
             # 3. Get fiscal risk data
             fiscal_data = await self.financial_db.analyze_expenditure_patterns()
             
-            # Create enhanced risk analysis prompt with real data
-            prompt = f"""
+            # Scenario-specific tail - kept after the cached static prefix
+            prompt_tail = f"""
             Comprehensive Risk Assessment for Business Scenario:
             {scenario}
             
@@ -132,34 +120,28 @@ class RiskAgent:
             - Economic Stability: {economic_indicators.get('summary', 'Available')}
             - Fiscal Health: {fiscal_data.get('summary', 'Available')}
             
-            Identify and analyze the following risk categories:
-            1. Financial risks (cash flow, funding, market volatility)
-            2. Operational risks (execution, scalability, resource constraints)
-            3. Market risks (competition, demand fluctuation, regulatory changes)
-            4. Technical risks (technology failure, security breaches, compliance)
-            5. Strategic risks (strategic misalignment, reputation, partnerships)
-            
             Risk Analysis:"""
             
-            # Tokenize input and move to correct device
-            inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
-            inputs = inputs.to(self.device)  # Move inputs to same device as model
+            # Cached prefix ids + freshly tokenized tail, on the model's device
+            inputs, prefix_cache = self.prompt_cache.build_inputs(prompt_tail)
             
             # Generate analysis
-            with torch.no_grad():
-                outputs = self.model.generate(
+            # Generate on a worker thread so the event loop keeps serving requests
+            async with self.generate_lock:
+                outputs = await generate_in_thread(
+                    self.model,
                     inputs,
                     max_length=inputs.shape[1] + 250,
                     num_return_sequences=1,
                     temperature=0.7,
                     do_sample=True,
                     pad_token_id=self.tokenizer.eos_token_id,
-                    attention_mask=torch.ones_like(inputs)  # Explicit attention mask
+                    attention_mask=torch.ones_like(inputs),  # Explicit attention mask
+                    past_key_values=prefix_cache  # Static prefix already prefilled
                 )
             
-            # Decode response
-            generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            analysis = generated_text[len(prompt):].strip()
+            # Decode only the newly generated tokens
+            analysis = self.tokenizer.decode(outputs[0][inputs.shape[1]:], skip_special_tokens=True).strip()
             
             # Combine AI analysis with comprehensive real risk data
             result = {
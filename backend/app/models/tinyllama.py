@@ -0,0 +1,85 @@
+"""
+🦙 Shared TinyLlama Loader
+The one load configuration for the TinyLlama weights the Risk and Market agents borrow
+from the model pool, so whichever agent initializes first loads what both expect
+"""
+import functools
+import importlib.util
+import os
+
+import torch
+from transformers import AutoModelForCausalLM, AwqConfig, BitsAndBytesConfig
+
+from .model_pool import get_model
+
+TINYLLAMA_MODEL = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+
+# Prequantized AWQ (W4A16) TinyLlama used on GPU when autoawq is installed, instead of bitsandbytes NF4
+TINYLLAMA_AWQ_MODEL = os.getenv("AIRA_MARKET_AWQ_MODEL", "TheBloke/TinyLlama-1.1B-Chat-v1.0-AWQ")
+TINYLLAMA_USE_AWQ = importlib.util.find_spec("awq") is not None
+
+# FlashAttention-2 kernels on GPU when flash-attn is installed, PyTorch SDPA otherwise
+TINYLLAMA_GPU_ATTENTION = "flash_attention_2" if importlib.util.find_spec("flash_attn") else "sdpa"
+
+def compute_dtype(device: str) -> torch.dtype:
+    """Half-precision compute dtype for the device"""
+    # Ada (RTX 4050) runs BF16 at FP16 speed with FP32's exponent range, so no overflow in long prompts
+    return torch.bfloat16 if device == "cuda" and torch.cuda.is_bf16_supported() else torch.float16
+
+def checkpoint(device: str) -> str:
+    """Checkpoint loaded on the device - the shared pool key"""
+    return TINYLLAMA_AWQ_MODEL if device == "cuda" and TINYLLAMA_USE_AWQ else TINYLLAMA_MODEL
+
+def memory_note(device: str) -> str:
+    """Memory footprint note for agents' ready log lines"""
+    if device == "cuda" and TINYLLAMA_USE_AWQ:
+        return f"~0.5GB VRAM, AWQ, {TINYLLAMA_GPU_ATTENTION}"
+    if device == "cuda":
+        return f"~0.5GB VRAM, {TINYLLAMA_GPU_ATTENTION}"
+    return "~1GB RAM"
+
+def load_tinyllama(device: str):
+    """Load TinyLlama for the device"""
+    if device == "cuda" and TINYLLAMA_USE_AWQ:
+        # Int4 weights with fused int4 x fp16 ExLlama GEMMs - no per-matmul NF4 dequantization
+        return AutoModelForCausalLM.from_pretrained(
+            TINYLLAMA_AWQ_MODEL,
+            quantization_config=AwqConfig(version="exllama"),
+            device_map="auto",
+            torch_dtype=torch.float16,  # ExLlama kernels only take fp16 activations
+            attn_implementation=TINYLLAMA_GPU_ATTENTION,
+            max_memory={0: "800MB", "cpu": "4GB"}  # Conservative + CPU fallback
+        )
+
+    if device == "cuda":
+        # 4-bit NF4 quantization for RTX 4050 (6GB VRAM)
+        return AutoModelForCausalLM.from_pretrained(
+            TINYLLAMA_MODEL,
+            quantization_config=BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=compute_dtype(device),
+                bnb_4bit_use_double_quant=True,
+                bnb_4bit_quant_type="nf4",
+                llm_int8_enable_fp32_cpu_offload=True  # Enable CPU offload for tight VRAM
+            ),
+            device_map="auto",  # Let transformers handle allocation
+            trust_remote_code=True,
+            torch_dtype=compute_dtype(device),
+            attn_implementation=TINYLLAMA_GPU_ATTENTION,  # Fused attention instead of the eager path
+            max_memory={0: "800MB", "cpu": "4GB"}  # Conservative + CPU fallback
+        )
+
+    # CPU fallback configuration
+    return AutoModelForCausalLM.from_pretrained(
+        TINYLLAMA_MODEL,
+        torch_dtype=torch.float32,  # Use float32 for CPU stability
+        device_map={"": "cpu"},
+        trust_remote_code=True,
+        low_cpu_mem_usage=True,
+        attn_implementation="sdpa",  # Fused scaled-dot-product attention
+        use_cache=True
+    )
+
+async def get_tinyllama(device: str):
+    """Borrow the process-wide TinyLlama for the device from the model pool"""
+    return await get_model(checkpoint(device), device, functools.partial(load_tinyllama, device))
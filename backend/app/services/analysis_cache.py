@@ -0,0 +1,142 @@
+"""
+🗄️ Analysis Result Cache
+Two-level cache for Four Pillars analysis results:
+- L1: per-process dict with TTL
+- L2: optional Redis shared by every uvicorn worker (enabled via REDIS_URL)
+Plus a per-process semantic index so paraphrased scenarios reuse L1 results.
+"""
+import logging
+import json
+import os
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+from hashlib import blake2b
+
+import numpy as np
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis is optional - L1 cache still works without it
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    def __init__(self, ttl: int = None, max_entries: int = 256):
+        self.cache = {}
+        self.cache_ttl = ttl if ttl is not None else int(os.getenv("AIRA_CACHE_TTL", "3600"))
+        self.max_entries = max_entries
+        self.redis = None
+
+        # analysis_focus -> (unit-norm scenario embeddings [n, d], matching cache keys)
+        self.semantic_index: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+        self.similarity_threshold = float(os.getenv("AIRA_SEMANTIC_CACHE_THRESHOLD", "0.93"))
+
+    async def initialize(self):
+        """Connect the shared Redis layer if REDIS_URL is configured"""
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            logger.info("🗄️ Analysis cache running in-process only (REDIS_URL not set)")
+            return
+        if redis_asyncio is None:
+            logger.warning("⚠️ REDIS_URL set but redis package not installed - using in-process cache only")
+            return
+
+        try:
+            client = redis_asyncio.Redis.from_url(redis_url)
+            await client.ping()
+            self.redis = client
+            logger.info("✅ Analysis cache connected to Redis")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis unavailable ({e}) - using in-process cache only")
+            self.redis = None
+
+    async def close(self):
+        """Close the Redis connection"""
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+
+    @staticmethod
+    def make_key(scenario: str, analysis_focus: str) -> str:
+        """Build the cache key shared by L1 and L2"""
+        digest = blake2b(scenario.encode("utf-8"), digest_size=16).hexdigest()
+        return f"aira:{analysis_focus}:{digest}"
+
+    async def get(self, scenario: str, analysis_focus: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis result or None"""
+        key = self.make_key(scenario, analysis_focus)
+
+        if self._is_cached(key):
+            return self.cache[key]["data"]
+
+        if self.redis is not None:
+            try:
+                payload = await self.redis.get(key)
+                if payload is not None:
+                    data = json.loads(payload)
+                    self._cache_data(key, data)
+                    return data
+            except Exception as e:
+                logger.warning(f"Redis cache read failed: {e}")
+
+        return None
+
+    async def set(self, scenario: str, analysis_focus: str, result: Dict[str, Any]):
+        """Store an analysis result in both cache levels"""
+        key = self.make_key(scenario, analysis_focus)
+        self._cache_data(key, result)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, json.dumps(result, default=str), ex=self.cache_ttl)
+            except Exception as e:
+                logger.warning(f"Redis cache write failed: {e}")
+
+    def get_similar(self, embedding: np.ndarray, analysis_focus: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (result, similarity) for the closest cached scenario above the similarity threshold"""
+        entry = self.semantic_index.get(analysis_focus)
+        if entry is None:
+            return None
+
+        embeddings, keys = entry
+        scores = embeddings @ embedding
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        if similarity < self.similarity_threshold or not self._is_cached(keys[best]):
+            return None
+        return self.cache[keys[best]]["data"], similarity
+
+    def remember(self, embedding: np.ndarray, scenario: str, analysis_focus: str):
+        """Index the embedding of a cached scenario for similarity lookups"""
+        key = self.make_key(scenario, analysis_focus)
+        embeddings, keys = self.semantic_index.get(
+            analysis_focus, (np.empty((0, embedding.shape[0]), dtype=embedding.dtype), [])
+        )
+        if key in keys:
+            return
+
+        embeddings = np.vstack([embeddings, embedding[None, :]])[-self.max_entries:]
+        keys = (keys + [key])[-self.max_entries:]
+        self.semantic_index[analysis_focus] = (embeddings, keys)
+
+    def _is_cached(self, key: str) -> bool:
+        """Check if data is cached and still valid"""
+        if key not in self.cache:
+            return False
+
+        cache_time = self.cache[key]["timestamp"]
+        if (datetime.now() - cache_time).total_seconds() < self.cache_ttl:
+            return True
+
+        del self.cache[key]
+        return False
+
+    def _cache_data(self, key: str, data: Any):
+        """Cache data with timestamp, evicting the oldest entry when full"""
+        if key not in self.cache and len(self.cache) >= self.max_entries:
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[key] = {
+            "data": data,
+            "timestamp": datetime.now()
+        }
@@ -12,7 +12,7 @@ Total VRAM Usage: ~3.1GB (Perfect for RTX 4050 6GB)
 """
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from datetime import datetime
 import json
 import os
@@ -25,6 +25,7 @@ from app.models.finance_agent import FinanceAgent
 from app.models.risk_agent import RiskAgent
 from app.models.compliance_agent import ComplianceAgent
 from app.models.market_agent import MarketAgent  # Re-enabled with TinyLlama
+from app.utils.prompt_cache import KV_CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +61,9 @@ class FourPillarsCrewAI:
         logger.info("🚀 Initializing CrewAI Four Pillars system with real models...")
         
         try:
+            # Persistent pool for prefilled prompt KV caches (reloaded instead of re-prefilled)
+            os.makedirs(KV_CACHE_DIR, exist_ok=True)
+            
             # Initialize our model agents - GPU agents first for better performance
             logger.info("� Loading GPU-optimized agents...")
             await self.finance_model.initialize()      # Phi-3.5-mini -> GPU
@@ -348,6 +352,20 @@ class FourPillarsCrewAI:
         
         return analyze_market
     
+    # (result key, analysis focus, log label, prompt prefix) for each pillar, in execution order
+    PILLARS = [
+        ("finance", "financial", "💰 Running Finance Agent analysis...", "Financial Analysis for"),
+        ("risk", "risk", "🛡️ Running Risk Agent analysis...", "Risk Assessment for"),
+        ("compliance", "compliance", "⚖️ Running Compliance Agent analysis...", "Compliance Analysis for"),
+        ("market", "market", "📈 Running Market Agent analysis...", "Market Analysis for")
+    ]
+    
+    # Execution plan per analysis focus - built once instead of re-filtering PILLARS per request
+    PLANS = {
+        "comprehensive": PILLARS,
+        **{pillar[1]: [pillar] for pillar in PILLARS}
+    }
+    
     async def analyze_business_scenario(self, scenario: str, analysis_focus: str = "comprehensive") -> Dict[str, Any]:
         """
         Run local model analysis on business scenario (bypassing CrewAI coordination)
@@ -356,6 +374,18 @@ class FourPillarsCrewAI:
             scenario: Business scenario description
             analysis_focus: 'comprehensive', 'financial', 'risk', 'compliance', 'market'
         """
+        response = None
+        async for update in self.analyze_with_updates(scenario, analysis_focus):
+            if update["type"] == "analysis_complete":
+                response = update["result"]
+        return response
+    
+    async def analyze_with_updates(self, scenario: str, analysis_focus: str = "comprehensive") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run local model analysis, yielding a progress update as each agent starts and finishes
+        
+        The last update has type 'analysis_complete' and carries the formatted result.
+        """
         if not self.is_initialized:
             await self.initialize()
         
@@ -367,25 +397,23 @@ class FourPillarsCrewAI:
             # Run direct analysis using our local models instead of CrewAI coordination
             results = {}
             
-            if analysis_focus == "comprehensive" or analysis_focus == "financial":
-                logger.info("💰 Running Finance Agent analysis...")
-                finance_result = await self.finance_model.analyze(f"Financial Analysis for: {scenario}")
-                results['finance'] = finance_result
-            
-            if analysis_focus == "comprehensive" or analysis_focus == "risk":
-                logger.info("🛡️ Running Risk Agent analysis...")
-                risk_result = await self.risk_model.analyze(f"Risk Assessment for: {scenario}")
-                results['risk'] = risk_result
-            
-            if analysis_focus == "comprehensive" or analysis_focus == "compliance":
-                logger.info("⚖️ Running Compliance Agent analysis...")
-                compliance_result = await self.compliance_model.analyze(f"Compliance Analysis for: {scenario}")
-                results['compliance'] = compliance_result
-            
-            if analysis_focus == "comprehensive" or analysis_focus == "market":
-                logger.info("📈 Running Market Agent analysis...")
-                market_result = await self.market_model.analyze(f"Market Analysis for: {scenario}")
-                results['market'] = market_result
+            for agent_name, focus, log_message, prompt_prefix in self.PLANS.get(analysis_focus, ()):
+                logger.info(log_message)
+                yield {
+                    "type": "agent_started",
+                    "agent": agent_name,
+                    "timestamp": datetime.now().isoformat()
+                }
+                
+                model = getattr(self, f"{agent_name}_model")
+                results[agent_name] = await model.analyze(f"{prompt_prefix}: {scenario}")
+                
+                yield {
+                    "type": "agent_complete",
+                    "agent": agent_name,
+                    "result": results[agent_name],
+                    "timestamp": datetime.now().isoformat()
+                }
             
             execution_time = (datetime.now() - start_time).total_seconds()
             
@@ -393,7 +421,11 @@ class FourPillarsCrewAI:
             response = self._format_local_analysis_result(results, scenario, analysis_focus, execution_time)
             
             logger.info(f"✅ Local model analysis completed in {execution_time:.2f}s")
-            return response
+            yield {
+                "type": "analysis_complete",
+                "result": response,
+                "timestamp": datetime.now().isoformat()
+            }
             
         except Exception as e:
             logger.error(f"❌ Local model analysis failed: {e}")
@@ -0,0 +1,23 @@
+"""
+🧵 Inference Thread Offloading
+Runs blocking model.generate calls in the AnyIO worker pool so the event loop
+keeps serving other requests while an agent generates
+"""
+import functools
+
+import anyio
+import torch
+
+def _generate(model, *args, **kwargs):
+    """Call model.generate under inference mode (thread-local, so it is entered on the worker)"""
+    with torch.inference_mode():
+        cache = kwargs.get("past_key_values")
+        if getattr(cache, "is_compileable", False):
+            # A reused static cache still holds the last call's keys/values; it was allocated under
+            # inference mode, so it can only be emptied in here
+            cache.reset()
+        return model.generate(*args, **kwargs)
+
+async def generate_in_thread(model, *args, **kwargs):
+    """Await model.generate(*args, **kwargs) on a worker thread"""
+    return await anyio.to_thread.run_sync(functools.partial(_generate, model, *args, **kwargs))
@@ -0,0 +1,104 @@
+"""
+🧠 Prompt Prefix Cache
+Prefills the static instruction block of an agent prompt once and reuses its
+KV cache on every call, so only the per-scenario tail is prefilled per request.
+Prefilled caches are persisted under KV_CACHE_DIR so restarts and sibling
+workers reload them instead of prefilling again.
+"""
+import asyncio
+import contextlib
+import copy
+import logging
+import os
+import tempfile
+from hashlib import blake2b
+from typing import Any, Optional, Tuple
+
+import torch
+from transformers import DynamicCache
+
+logger = logging.getLogger(__name__)
+
+# Persistent pool of prefilled prefix KV caches (created by FourPillarsCrewAI.initialize)
+KV_CACHE_DIR = os.path.expanduser(os.getenv("AIRA_KV_CACHE_DIR", "~/.aira/kvcache"))
+
+def _save_atomic(obj: Any, path: str):
+    """torch.save to a temp file beside path and rename it into place, so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            torch.save(obj, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class PromptPrefixCache:
+    def __init__(self, model, tokenizer, prefix: str, max_length: int = 512):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.prefix_ids = tokenizer.encode(prefix, return_tensors="pt")
+        self.prefix_cache: Optional[DynamicCache] = None
+
+    def _cache_path(self) -> str:
+        """File holding this prefix's KV cache for the current model and device"""
+        key = f"{self.model.name_or_path}|{self.model.device}|{self.model.dtype}"
+        digest = blake2b(key.encode("utf-8") + self.prefix_ids.cpu().numpy().tobytes(), digest_size=16).hexdigest()
+        return os.path.join(KV_CACHE_DIR, f"{digest}.pt")
+
+    async def warm(self):
+        """Load the prefix KV cache from disk, or prefill it once and persist it"""
+        try:
+            self.prefix_ids = self.prefix_ids.to(self.model.device)
+            path = self._cache_path()
+
+            if os.path.exists(path):
+                try:
+                    legacy = await asyncio.to_thread(torch.load, path, map_location=self.model.device, weights_only=True)
+                    self.prefix_cache = DynamicCache.from_legacy_cache(tuple(tuple(layer) for layer in legacy))
+                    logger.info(f"🧠 Prompt prefix cache loaded from disk ({self.prefix_ids.shape[1]} tokens)")
+                    return
+                except Exception as e:
+                    # Unreadable file (e.g. left by a crash) - drop it, then prefill and persist a fresh one
+                    logger.warning(f"⚠️ Discarding unreadable prompt prefix cache {path}: {e}")
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+
+            with torch.no_grad():
+                self.prefix_cache = self.model(
+                    self.prefix_ids,
+                    past_key_values=DynamicCache(),
+                    use_cache=True
+                ).past_key_values
+            logger.info(f"🧠 Prompt prefix cached ({self.prefix_ids.shape[1]} tokens)")
+        except Exception as e:
+            logger.warning(f"⚠️ Prompt prefix caching unavailable ({e}) - prefilling full prompt per call")
+            self.prefix_cache = None
+            return
+
+        if os.path.isdir(KV_CACHE_DIR):
+            try:
+                await asyncio.to_thread(_save_atomic, self.prefix_cache.to_legacy_cache(), path)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not persist prompt prefix cache: {e}")
+
+    def build_inputs(self, tail: str) -> Tuple[torch.Tensor, Any]:
+        """
+        Tokenize only the dynamic tail and append it to the cached prefix
+
+        Returns:
+            (input_ids, past_key_values) ready for model.generate
+        """
+        budget = max(self.max_length - self.prefix_ids.shape[1], 1)
+        tail_ids = self.tokenizer.encode(
+            tail,
+            add_special_tokens=False,
+            return_tensors="pt",
+            max_length=budget,
+            truncation=True
+        ).to(self.prefix_ids.device)
+        input_ids = torch.cat([self.prefix_ids, tail_ids], dim=1)
+
+        # generate() extends the cache in place, so every call gets its own copy
+        return input_ids, copy.deepcopy(self.prefix_cache)
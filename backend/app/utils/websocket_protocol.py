@@ -0,0 +1,20 @@
+"""
+🔌 WebSocket Protocol Tuning
+uvicorn websockets protocol with a larger transport write buffer
+"""
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+
+# High-water mark for the transport write buffer (websockets defaults to 64 KiB)
+WS_WRITE_LIMIT = 128 * 1024
+
+class LargeBufferWebSocketProtocol(WebSocketProtocol):
+    """
+    Same as uvicorn's websockets protocol, but lets up to 128 KiB queue in the
+    transport before applying backpressure, so batched /ws frames are flushed in
+    fewer, larger writes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Applied to the transport in connection_made()
+        self.write_limit = WS_WRITE_LIMIT
@@ -215,10 +215,5 @@ async def get_example_scenarios():
     }
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "crewai_main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    from app.main_core import server_options
+    uvicorn.run("crewai_main:app", **server_options())
@@ -17,6 +17,7 @@ import asyncio
 import logging
 import uvicorn
 from app.main import app
+from app.main_core import server_options
 
 # Configure logging
 logging.basicConfig(
@@ -59,15 +60,8 @@ def main():
     logger.info("🌐 WebSocket Endpoint: ws://localhost:8000/ws")
     logger.info("⚡ Health Check: http://localhost:8000/health")
     
-    # Start the FastAPI server
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info",
-        access_log=True
-    )
+    # Start the FastAPI server (uvloop + httptools, reload and access logs only with AIRA_DEV=1)
+    uvicorn.run("app.main:app", **server_options())
 
 if __name__ == "__main__":
     main()
@@ -33,14 +33,8 @@ print(f"   🌐 ONLINE MODE: {os.environ.get('HF_HUB_OFFLINE')}")
 # Start the application
 if __name__ == "__main__":
     # Import and run the main application
-    from app.main import app
+    from app.main_core import server_options
     import uvicorn
     
     print("\n🚀 Starting Four Pillars AI with local models...")
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        reload=False,  # Disable reload in production
-        log_level="info"
-    )
\ No newline at end of file
+    uvicorn.run("app.main:app", **server_options(reload=False))  # Disable reload in production
\ No newline at end of file